@@ -0,0 +1,204 @@
+"""
+Synthetic CV corpus for the benchmarks
+Generates Swedish/English CV Markdown and matching PDFs of varying length and PII density
+Run with: python bench_corpus.py --out corpus/ [--count 20] [--seed 1]
+"""
+import argparse
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+
+FIRST_NAMES = ["Anna", "Erik", "Maria", "Johan", "Sara", "Karl", "Emma", "Lars", "Linnéa", "Björn",
+               "Sofia", "Mikael", "Åsa", "Oskar", "Elin", "Jesper", "Ida", "Nils", "Frida", "Göran"]
+LAST_NAMES = ["Svensson", "Andersson", "Johansson", "Karlsson", "Nilsson", "Eriksson", "Larsson",
+              "Olsson", "Persson", "Lindqvist", "Åberg", "Öberg", "Wärn", "Berglund", "Holm"]
+STREETS = ["Storgatan", "Kungsvägen", "Drottninggatan", "Vasagatan", "Linnégatan", "Skolgatan"]
+CITIES = [("411 38", "Göteborg"), ("111 22", "Stockholm"), ("211 45", "Malmö"), ("753 10", "Uppsala")]
+COMPANIES = ["Volvo Group", "Ericsson", "Spotify", "Klarna", "IKEA", "Saab", "Scania", "Region Skåne"]
+SCHOOLS = ["Chalmers tekniska högskola", "KTH", "Lunds universitet", "Uppsala universitet"]
+SKILLS = ["Python", "Java", "TypeScript", "Docker", "Kubernetes", "SQL", "React", "Go", "Terraform",
+          "Agile", "Scrum", "Git", "Linux", "AWS", "Azure", "C#", ".NET", "Kafka"]
+
+HEADINGS = {
+    "sv": {"personal": "Personuppgifter", "experience": "Erfarenhet", "education": "Utbildning",
+           "skills": "Kompetenser", "references": "Referenser"},
+    "en": {"personal": "Personal information", "experience": "Experience", "education": "Education",
+           "skills": "Skills", "references": "References"},
+}
+
+FILLER = {
+    "sv": ["Ansvarade för utveckling och drift av tjänster i molnet",
+           "Arbetade nära produktägare och designers i ett agilt team",
+           "Införde automatiserade tester och kortade ledtiden för releaser",
+           "Handledde nyanställda utvecklare och höll i kodgranskningar",
+           "Byggde integrationer mellan lagersystem och ekonomisystem"],
+    "en": ["Responsible for building and operating cloud services",
+           "Worked closely with product owners and designers in an agile team",
+           "Introduced automated testing and shortened the release lead time",
+           "Mentored new developers and ran weekly code reviews",
+           "Built integrations between warehouse and finance systems"],
+}
+
+# (experience entries, filler lines per entry) per length class
+LENGTHS = {"short": (2, 2), "medium": (5, 4), "long": (15, 6)}
+# Probability that a body line carries extra PII (reference, phone, email)
+DENSITIES = {"low": 0.0, "medium": 0.15, "high": 0.4}
+
+
+@dataclass
+class CorpusCV:
+    """One synthetic CV in both formats"""
+    name: str
+    applicant_name: str
+    markdown: str
+    pdf: bytes
+    length: str
+    density: str
+    language: str
+
+
+def _phone(rng: random.Random) -> str:
+    return rng.choice([
+        f"07{rng.randint(0, 9)}-{rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+        f"+46 7{rng.randint(0, 9)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+    ])
+
+
+def _email(rng: random.Random, first: str, last: str, domain: str = "example.com") -> str:
+    return f"{first.lower()}.{last.lower()}@{domain}".replace("å", "a").replace("ä", "a").replace("ö", "o")
+
+
+def _person(rng: random.Random) -> tuple:
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def generate_cv_markdown(rng: random.Random, length: str, density: str, language: str) -> tuple:
+    """(markdown, applicant name) for one CV"""
+    headings = HEADINGS[language]
+    entries, filler_lines = LENGTHS[length]
+    pii_rate = DENSITIES[density]
+    first, last = _person(rng)
+    postal, city = rng.choice(CITIES)
+    year = rng.randint(1965, 2002)
+
+    lines = [
+        f"### {headings['personal']}",
+        f"{first} {last}",
+        f"{rng.choice(STREETS)} {rng.randint(1, 80)}, {postal} {city}",
+        f"Telefon: {_phone(rng)}",
+        f"E-post: {_email(rng, first, last)}",
+        f"Personnummer: {year}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}-{rng.randint(1000, 9999)}",
+        f"LinkedIn: https://www.linkedin.com/in/{first.lower()}{last.lower()}",
+        "",
+        f"### {headings['experience']}",
+    ]
+
+    start = rng.randint(2000, 2015)
+    for _ in range(entries):
+        end = start + rng.randint(1, 4)
+        lines.append(f"**{start} - {end}** {rng.choice(COMPANIES)}")
+        for _ in range(filler_lines):
+            line = rng.choice(FILLER[language])
+            if rng.random() < pii_rate:
+                ref_first, ref_last = _person(rng)
+                line += rng.choice([
+                    f", kontakt {ref_first} {ref_last} {_phone(rng)}",
+                    f", contact {_email(rng, ref_first, ref_last, 'company.se')}",
+                    f" tillsammans med {ref_first} {ref_last}",
+                ])
+            lines.append(f"- {line}")
+        lines.append("")
+        start = end
+
+    lines.append(f"### {headings['education']}")
+    lines.extend(f"- {rng.choice(['Civilingenjör', 'Kandidatexamen', 'MSc'])}, {school}"
+                 for school in rng.sample(SCHOOLS, 2))
+    lines.append("")
+    lines.append(f"### {headings['skills']}")
+    lines.append("- " + ", ".join(rng.sample(SKILLS, 8)))
+    lines.append("")
+
+    ref_first, ref_last = _person(rng)
+    lines.append(f"### {headings['references']}")
+    lines.append(f"Referens: {ref_first} {ref_last} (Gruppchef, {rng.choice(COMPANIES)})")
+    lines.append(f"Kontakt: {_email(rng, ref_first, ref_last, 'company.se')}, {_phone(rng)}")
+
+    return "\n".join(lines) + "\n", f"{first} {last}"
+
+
+def render_pdf(markdown: str) -> bytes:
+    """Lay the Markdown out as a plain A4 PDF, headings in bold"""
+    import pymupdf
+
+    margin, line_height, width, height = 50, 14, 595, 842
+    with pymupdf.open() as doc:
+        page = doc.new_page(width=width, height=height)
+        y = margin
+        for line in markdown.splitlines():
+            if y > height - margin:
+                page = doc.new_page(width=width, height=height)
+                y = margin
+            if line.startswith("### "):
+                y += 6
+                page.insert_text((margin, y), line[4:], fontname="hebo", fontsize=13)
+                y += line_height + 4
+            elif line:
+                page.insert_text((margin, y), line.replace("**", ""), fontname="helv", fontsize=10)
+                y += line_height
+            else:
+                y += line_height / 2
+        return doc.tobytes()
+
+
+def build_corpus(
+    count: int = 12,
+    seed: int = 1,
+    lengths: Sequence[str] = tuple(LENGTHS),
+    densities: Sequence[str] = tuple(DENSITIES),
+    languages: Sequence[str] = ("sv", "en"),
+    with_pdf: bool = True,
+) -> List[CorpusCV]:
+    """Deterministic corpus cycling through every length/density/language combination"""
+    rng = random.Random(seed)
+    combos = [(length, density, language) for length in lengths for density in densities for language in languages]
+    corpus = []
+    for i in range(count):
+        length, density, language = combos[i % len(combos)]
+        markdown, applicant_name = generate_cv_markdown(rng, length, density, language)
+        corpus.append(CorpusCV(
+            name=f"cv_{i:03d}_{length}_{density}_{language}",
+            applicant_name=applicant_name,
+            markdown=markdown,
+            pdf=render_pdf(markdown) if with_pdf else b"",
+            length=length,
+            density=density,
+            language=language,
+        ))
+    return corpus
+
+
+def write_corpus(corpus: List[CorpusCV], out_dir: Path) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for cv in corpus:
+        (out_dir / f"{cv.name}.md").write_text(cv.markdown, encoding="utf-8")
+        if cv.pdf:
+            (out_dir / f"{cv.name}.pdf").write_bytes(cv.pdf)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic CV corpus")
+    parser.add_argument('--out', type=Path, required=True, help='Directory to write .md and .pdf files to')
+    parser.add_argument('--count', type=int, default=18, help='Number of CVs (default: 18)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--no-pdf', action='store_true', help='Only write Markdown')
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.count, args.seed, with_pdf=not args.no_pdf)
+    write_corpus(corpus, args.out)
+    print(f"✅ Wrote {len(corpus)} CVs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Import-time benchmark for the backend service
+Measures how long `import server` takes in a fresh interpreter
+Run with: python bench_import.py [--runs 5] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+def time_import(module: str) -> float:
+    """Wall time of importing module in a fresh interpreter, in seconds"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    env = {**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "benchmark")}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, top: int) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module name) for the slowest imports, from -X importtime"""
+    env = {**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "benchmark")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend import time")
+    parser.add_argument('--module', default='server', help='Module to import (default: server)')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time (default: 5)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list (default: 10)')
+    args = parser.parse_args()
+
+    timings = [time_import(args.module) for _ in range(args.runs)]
+    print(f"⏱️  import {args.module}: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms over {args.runs} runs")
+
+    print(f"\nSlowest imports (cumulative):")
+    for cumulative, name in slowest_imports(args.module, args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
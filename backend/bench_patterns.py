@@ -0,0 +1,92 @@
+"""
+Micro-benchmark for PatternRedactor.detect
+Compares the hot-region scanner against the previous full-text scan
+Run with: python bench_patterns.py [--file cv.md] [--repeat 50]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import List
+
+from pii_redactor import PatternRedactor, PIIMatch
+
+
+SAMPLE_CV = """### Personal information
+Anna Karin Svensson
+Storgatan 12, 411 38 Göteborg
+Telefon: 070-123 45 67 / +46 70 123 45 67
+E-post: anna.svensson@example.com
+Personnummer: 19900512-1234
+LinkedIn: https://www.linkedin.com/in/annasvensson
+
+### Experience
+**2019 - 2023** Volvo Group, System Engineer
+Worked as a backend developer building services in Python and Go for the
+logistics platform, owning deployments and on-call rotation for the team.
+- Designed event driven integrations between warehouse systems
+- Mentored junior developers and ran weekly architecture reviews
+- Introduced contract testing and cut release lead time considerably
+
+### Education
+- Civilingenjör Datateknik, Chalmers tekniska högskola
+- Kandidatexamen i Datavetenskap
+
+### Skills
+- Python, Java, TypeScript, Docker, Kubernetes
+- Agile ways of working, code review, technical writing
+
+### References
+Referens: Per Andersson (Gruppchef, Volvo)
+Kontakt: per.andersson@volvo.com, 031-66 55 44
+Besöksadress: Kungsvägen 5
+123 45 Stockholm
+"""
+
+
+def full_scan_detect(redactor: PatternRedactor, text: str) -> List[PIIMatch]:
+    """Previous implementation: one finditer per pattern over the whole text"""
+    matches = []
+    for pii_type, pattern in redactor.compiled_patterns.items():
+        for match in pattern.finditer(text):
+            matches.append(PIIMatch(
+                text=match.group(),
+                start=match.start(),
+                end=match.end(),
+                pii_type=pii_type,
+                confidence=1.0,
+                source='PATTERN'
+            ))
+    return sorted(matches, key=lambda x: x.start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PatternRedactor.detect")
+    parser.add_argument('--file', type=str, help='Markdown CV to benchmark (default: built-in sample)')
+    parser.add_argument('--copies', type=int, default=20,
+                        help='Concatenate the CV this many times (default: 20)')
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='Timed iterations per implementation (default: 50)')
+    args = parser.parse_args()
+
+    text = Path(args.file).read_text(encoding='utf-8') if args.file else SAMPLE_CV
+    text = "\n".join([text] * args.copies)
+    redactor = PatternRedactor()
+
+    expected = full_scan_detect(redactor, text)
+    actual = redactor.detect(text)
+    if actual != expected:
+        print("❌ Output differs from the full-text scan")
+        sys.exit(1)
+    print(f"✅ Identical output: {len(actual)} matches over {len(text)} characters")
+
+    old = min(timeit.repeat(lambda: full_scan_detect(redactor, text), number=args.repeat, repeat=3))
+    new = min(timeit.repeat(lambda: redactor.detect(text), number=args.repeat, repeat=3))
+
+    print(f"  Full-text scan: {old / args.repeat * 1000:.2f} ms/call")
+    print(f"  Hot regions:    {new / args.repeat * 1000:.2f} ms/call")
+    print(f"  Speedup:        {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
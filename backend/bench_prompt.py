@@ -0,0 +1,77 @@
+"""
+Prompt-size benchmark for the word-level LLM anonymizer
+Compares the JSON word encoding against the compact index<TAB>word encoding, and the
+hybrid mode that only sends lines the local rules leave uncertain, on the synthetic
+corpus and a stub LLM whose latency grows with the prompt
+Run with: python bench_prompt.py [--count 18] [--ms-per-1k-tokens 400]
+"""
+import argparse
+import time
+
+import llm_anonymizer
+from bench_corpus import build_corpus
+from bench_redaction import StubLLMServer
+
+# (label, prompt format, redaction mode)
+MODES = [
+    ("json", "json", "llm"),
+    ("compact", "compact", "llm"),
+    ("hybrid", "compact", "hybrid"),
+]
+
+
+def prompt_tokens(corpus, prompt_format: str, mode: str) -> tuple:
+    """(estimated prompt tokens, LLM calls) over the corpus, 4 characters per token"""
+    system = llm_anonymizer.COMPACT_SYSTEM_PROMPT if prompt_format == "compact" else llm_anonymizer.SYSTEM_PROMPT
+    tokens = calls = 0
+    for cv in corpus:
+        for page in llm_anonymizer.extract_words_with_positions(cv.pdf):
+            if mode == "hybrid":
+                redacted = llm_anonymizer.local_redactions(page, cv.applicant_name)
+                lines = llm_anonymizer.uncertain_lines(page, redacted)
+            else:
+                lines = llm_anonymizer.page_lines(page)
+            if lines:
+                calls += 1
+                tokens += (len(system) + len(llm_anonymizer.build_page_prompt(page, lines, prompt_format))) // 4
+    return tokens, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM prompt encodings")
+    parser.add_argument('--count', type=int, default=18, help='CVs in the synthetic corpus (default: 18)')
+    parser.add_argument('--ms-per-1k-tokens', type=float, default=400.0,
+                        help='Stub LLM latency per 1000 prompt tokens (default: 400)')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.count)
+    pages = [page for cv in corpus for page in llm_anonymizer.extract_words_with_positions(cv.pdf)]
+    print(f"📚 Corpus: {len(corpus)} CVs, {len(pages)} pages, "
+          f"{sum(len(page.texts) for page in pages)} words")
+
+    print(f"\n{'Mode':<22} {'tokens':>9} {'vs json':>8} {'calls':>6} {'s/CV':>7}")
+    print("-" * 56)
+    baseline = None
+    calls_per_mode = {}
+    with StubLLMServer(seconds_per_1k_tokens=args.ms_per_1k_tokens / 1000):
+        for label, prompt_format, mode in MODES:
+            tokens, calls = prompt_tokens(corpus, prompt_format, mode)
+            baseline = baseline or tokens
+            calls_per_mode[label] = calls
+
+            llm_anonymizer.LLM_PROMPT_FORMAT = prompt_format
+            start = time.perf_counter()
+            for cv in corpus:
+                llm_anonymizer.anonymize_pdf_with_llm(cv.pdf, cv.applicant_name, mode)
+            per_cv = (time.perf_counter() - start) / len(corpus)
+
+            print(f"{label:<22} {tokens:>9} {tokens / baseline:>8.0%} {calls:>6} {per_cv:>7.3f}")
+
+    # Hybrid only pays off if the local rules settle whole pages
+    assert calls_per_mode["hybrid"] < calls_per_mode["compact"], (
+        f"hybrid made {calls_per_mode['hybrid']} LLM calls, compact {calls_per_mode['compact']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Benchmark suite for the redaction engine over the synthetic corpus in bench_corpus.py
+Reports throughput (CVs/s, MB/s) and peak Python memory per stage, and fails when a
+stage regresses against a saved baseline. The LLM stages talk to a local stub server,
+so everything runs offline.
+Run with: python bench_redaction.py [--count 18] [--repeat 5] [--llm] [--baseline bench_baseline.json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from bench_corpus import CorpusCV, build_corpus
+
+
+@dataclass
+class Benchmark:
+    """One stage to time: run(cv) over every CV, size(cv) is the input it consumes"""
+    name: str
+    run: Callable[[CorpusCV], object]
+    size: Callable[[CorpusCV], int]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    cvs: int
+    seconds: float
+    input_bytes: int
+    peak_bytes: int
+
+    @property
+    def cvs_per_s(self) -> float:
+        return self.cvs / self.seconds
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.input_bytes / self.seconds / 1e6
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"cvs_per_s": round(self.cvs_per_s, 2), "mb_per_s": round(self.mb_per_s, 3),
+                "peak_kib": round(self.peak_bytes / 1024, 1)}
+
+
+# ----- Stub LLM server -----
+
+_CONTACT_WORD = re.compile(r"@|^\+?\d[\d\-]{5,}$|linkedin\.com")
+
+
+class _StubLLMHandler(BaseHTTPRequestHandler):
+    """Answers /chat/completions like the OpenAI API, deterministically and without a model"""
+    latency = 0.0
+    seconds_per_1k_tokens = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        system, user = body["messages"][0]["content"], body["messages"][-1]["content"]
+        prompt_tokens = (len(system) + len(user)) // 4
+        time.sleep(self.latency + self.seconds_per_1k_tokens * prompt_tokens / 1000)
+
+        if '"redact_ids"' in system:
+            # Word-level anonymizer, JSON words: flag contact details
+            words = json.loads(user)["words"]
+            content = json.dumps({"redact_ids": [w["id"] for w in words if _CONTACT_WORD.search(w["text"])]})
+        elif '"redact"' in system:
+            # Word-level anonymizer, index<TAB>word rows
+            rows = [row.split("\t", 1) for row in user.splitlines() if row]
+            content = json.dumps({"redact": [int(i) for i, word in rows if _CONTACT_WORD.search(word)]})
+        else:
+            # Markdown formatter: echo the text under the first default section
+            payload = json.loads(user)
+            content = f"### {payload['default_sections'][0]}\n{payload['text']}"
+
+        response = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 0, "total_tokens": prompt_tokens},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubLLMServer:
+    """Local OpenAI-compatible server; points OPENAI_BASE_URL at itself while running"""
+
+    def __init__(self, latency: float = 0.0, seconds_per_1k_tokens: float = 0.0):
+        handler = type("Handler", (_StubLLMHandler,),
+                       {"latency": latency, "seconds_per_1k_tokens": seconds_per_1k_tokens})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        os.environ["OPENAI_BASE_URL"] = self.base_url
+        os.environ["OPENAI_API_KEY"] = "benchmark"
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ----- Benchmarks -----
+
+def _markdown_size(cv: CorpusCV) -> int:
+    return len(cv.markdown.encode("utf-8"))
+
+
+def _pdf_size(cv: CorpusCV) -> int:
+    return len(cv.pdf)
+
+
+def engine_benchmarks() -> List[Benchmark]:
+    from pii_redactor import NameDetector, PatternRedactor, PIIRedactor
+    from pdf_extract import extract_text
+    from llm_anonymizer import extract_words_with_positions
+
+    patterns = PatternRedactor()
+    names = NameDetector()
+    redactor = PIIRedactor()
+    return [
+        Benchmark("PatternRedactor.detect", lambda cv: patterns.detect(cv.markdown), _markdown_size),
+        Benchmark("NameDetector.detect", lambda cv: names.detect(cv.markdown, cv.applicant_name), _markdown_size),
+        Benchmark("PIIRedactor.redact",
+                  lambda cv: redactor.redact(cv.markdown, applicant_name=cv.applicant_name), _markdown_size),
+        Benchmark("pdf_extract.extract_text", lambda cv: extract_text(cv.pdf), _pdf_size),
+        Benchmark("extract_words_with_positions", lambda cv: extract_words_with_positions(cv.pdf), _pdf_size),
+    ]
+
+
+def llm_benchmarks() -> List[Benchmark]:
+    import extract_text
+    from llm_anonymizer import anonymize_pdf_with_llm
+    from markdown_cache import MarkdownCache
+
+    # Own in-memory cache: clearing the configured one would wipe the service's
+    # shared MARKDOWN_CACHE_DB
+    bench_cache = MarkdownCache()
+    extract_text.markdown_cache = bench_cache
+
+    def to_markdown(cv: CorpusCV) -> str:
+        bench_cache.clear()  # measure the pipeline, not the cache
+        return extract_text.extract_text_to_markdown(cv.pdf)
+
+    return [
+        Benchmark("extract_text_to_markdown (stub LLM)", to_markdown, _pdf_size),
+        Benchmark("anonymize_pdf_with_llm (stub LLM)", lambda cv: anonymize_pdf_with_llm(cv.pdf), _pdf_size),
+    ]
+
+
+def run_benchmark(bench: Benchmark, corpus: List[CorpusCV], repeat: int) -> BenchResult:
+    """Best of `repeat` timed passes over the corpus, memory measured on a separate pass"""
+    for cv in corpus:  # warm-up: caches, lazy imports, compiled patterns
+        bench.run(cv)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for cv in corpus:
+            bench.run(cv)
+        best = min(best, time.perf_counter() - start)
+
+    # tracemalloc slows allocation down, so keep it out of the timed passes
+    tracemalloc.start()
+    peak = 0
+    for cv in corpus:
+        tracemalloc.reset_peak()
+        bench.run(cv)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return BenchResult(bench.name, len(corpus), best, sum(bench.size(cv) for cv in corpus), peak)
+
+
+def check_regressions(results: List[BenchResult], baseline: Dict[str, Dict[str, float]],
+                      tolerance: float) -> List[str]:
+    """Stages that are slower or use more memory than the baseline allows"""
+    failures = []
+    for result in results:
+        expected = baseline.get(result.name)
+        if not expected:
+            continue
+        if result.cvs_per_s < expected["cvs_per_s"] * (1 - tolerance):
+            failures.append(f"{result.name}: {result.cvs_per_s:.1f} CVs/s, "
+                            f"baseline {expected['cvs_per_s']:.1f} CVs/s")
+        if result.peak_bytes / 1024 > expected["peak_kib"] * (1 + tolerance):
+            failures.append(f"{result.name}: peak {result.peak_bytes / 1024:.0f} KiB, "
+                            f"baseline {expected['peak_kib']:.0f} KiB")
+    return failures
+
+
+def print_results(results: List[BenchResult]):
+    print(f"\n{'Stage':<38} {'CVs/s':>10} {'MB/s':>9} {'ms/CV':>9} {'peak KiB':>10}")
+    print("-" * 80)
+    for r in results:
+        print(f"{r.name:<38} {r.cvs_per_s:>10.1f} {r.mb_per_s:>9.2f} "
+              f"{r.seconds / r.cvs * 1000:>9.2f} {r.peak_bytes / 1024:>10.0f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the redaction engine")
+    parser.add_argument('--count', type=int, default=18, help='CVs in the synthetic corpus (default: 18)')
+    parser.add_argument('--seed', type=int, default=1, help='Corpus random seed (default: 1)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed passes per stage (default: 5)')
+    parser.add_argument('--only', type=str, help='Run only stages whose name contains this text')
+    parser.add_argument('--llm', action='store_true', help='Also benchmark the LLM pipelines against a stub server')
+    parser.add_argument('--llm-latency', type=float, default=0.0,
+                        help='Seconds the stub LLM waits per completion (default: 0)')
+    parser.add_argument('--baseline', type=Path, help='JSON file with baseline results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Write these results to --baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative regression against the baseline (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.count, args.seed)
+    total_md = sum(_markdown_size(cv) for cv in corpus)
+    total_pdf = sum(_pdf_size(cv) for cv in corpus)
+    print(f"📚 Corpus: {len(corpus)} CVs, {total_md / 1024:.0f} KiB Markdown, {total_pdf / 1024:.0f} KiB PDF")
+
+    with ExitStack() as stack:
+        benchmarks = engine_benchmarks()
+        if args.llm:
+            stack.enter_context(StubLLMServer(args.llm_latency))
+            benchmarks += llm_benchmarks()
+        if args.only:
+            benchmarks = [b for b in benchmarks if args.only.lower() in b.name.lower()]
+        results = [run_benchmark(bench, corpus, args.repeat) for bench in benchmarks]
+    print_results(results)
+
+    if args.baseline and args.save_baseline:
+        args.baseline.write_text(json.dumps({r.name: r.to_dict() for r in results}, indent=2) + "\n")
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    elif args.baseline:
+        failures = check_regressions(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if failures:
+            print(f"\n❌ {len(failures)} regression(s) beyond {args.tolerance:.0%}:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Regression checks for redaction behaviour that must not leak PII
+Each case is a text, an applicant name and what must (not) appear after redaction.
+Run with: python check_redaction.py
+"""
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from llm_anonymizer import uncertain_words
+from pii_redactor import redact_text
+
+
+@dataclass
+class Case:
+    name: str
+    text: str
+    applicant_name: Optional[str]
+    expected: List[str] = field(default_factory=list)  # Must appear in the redacted text
+    leaked: List[str] = field(default_factory=list)  # Must not appear in the redacted text
+
+
+CASES = [
+    # A reference sharing the applicant's surname: the applicant-part match sits
+    # inside the reference match and must not leave the first name in the clear
+    Case("reference with applicant surname",
+         "### Referenser\nReferens: Per Andersson (Gruppchef, Volvo)\n", "Anna Andersson",
+         expected=["Referens: [NAME] (Gruppchef"], leaked=["Per"]),
+    # Applicant names are matched case-insensitively beyond Latin-1/Latin Extended
+    Case("upper-case Vietnamese applicant name",
+         "NGUYỄN THỊ\nUtvecklare\n", "Nguyễn Thị", leaked=["NGUYỄN", "THỊ"]),
+    Case("upper-case Cyrillic applicant name",
+         "Kontakt: АНДРЕЙ ИВАНОВ\n", "Андрей Иванов", leaked=["АНДРЕЙ", "ИВАНОВ"]),
+    # No first/last name given: a blank name must not match every space
+    Case("blank applicant name",
+         "### Personuppgifter\nSara Lindqvist\nUtvecklare på Volvo\n", " ",
+         expected=["### Personuppgifter\n", "Utvecklare på Volvo"], leaked=["Sara", "Lindqvist"]),
+]
+
+
+# Lines hybrid mode must send to the LLM when the local rules redacted nothing on them
+UNCERTAIN_LINES = [
+    "Anna är en driven utvecklare",
+    "Erik tycker om att programmera",
+    "github: annasv",
+    "- Arbetade tillsammans med Johan Berglund",
+]
+
+
+def run_case(case: Case) -> List[str]:
+    redacted, _ = redact_text(case.text, applicant_name=case.applicant_name)
+    failures = [f"missing {text!r}" for text in case.expected if text not in redacted]
+    failures += [f"leaked {text!r}" for text in case.leaked if text in redacted]
+    return [f"{case.name}: {failure}\n    got: {redacted!r}" for failure in failures]
+
+
+def main():
+    failures = [failure for case in CASES for failure in run_case(case)]
+    failures += [
+        f"hybrid mode settles {line!r}" for line in UNCERTAIN_LINES
+        if not uncertain_words(line.split(), [False] * len(line.split()))
+    ]
+    if failures:
+        print(f"❌ {len(failures)} redaction check(s) failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"✅ {len(CASES) + len(UNCERTAIN_LINES)} redaction checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,37 @@
 """Turn short CV PDFs into structured Markdown."""
 
 from __future__ import annotations
+import asyncio
+import hashlib
 import json
+import logging
 import os
-from typing import Sequence
-from dotenv import load_dotenv
-from openai import OpenAI
-from pdf_extract import extract_text 
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal, Sequence
+from layout_markdown import structure_pdf_to_markdown
+from llm_client import get_async_client, get_client
+from markdown_cache import cache_from_env, content_key
+from metrics import span
+from pdf_extract import decode_pdf_input, extract_pages 
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-openai_key = os.getenv("OPENAI_API_KEY")
-if not openai_key:
-    raise RuntimeError("OPENAI_API_KEY is not set in .env")
+LLM_MODEL = "gpt-5-mini"
 
-client = OpenAI(api_key=openai_key)
+# Max LLM formatting calls in flight per process (async path only)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "200"))
+_llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+# Seconds to wait for the LLM formatter before falling back to the rule-based one
+LLM_FORMAT_TIMEOUT = float(os.getenv("LLM_FORMAT_TIMEOUT", "120"))
+
+# Approximate prompt budget per LLM call; longer CVs are split by page/paragraph
+LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "6000"))
+CHARS_PER_TOKEN = 4  # Rough average for Swedish/English text
+
+# "llm": gpt formatting (falls back to "rules" on error/timeout)
+# "rules": local layout-based formatting, no API call
+Formatter = Literal["llm", "rules"]
 
 DEFAULT_SECTIONS: Sequence[str] = (
     "Personal information",
@@ -51,10 +68,99 @@ Important rules:
 """
 
 
-def extract_text_to_markdown(pdf_input: bytes | str) -> str:
-    raw_text = extract_text(pdf_input)
-    raw_text = _clean_raw_text(raw_text)
-    return _format_markdown_with_llm(raw_text)
+# Changes whenever the prompt or its parameters change, invalidating cached output
+PROMPT_VERSION = hashlib.sha256(
+    json.dumps([SECTIONED_MD_SYSTEM_PROMPT, list(DEFAULT_SECTIONS), MAX_SECTIONS]).encode("utf-8")
+).hexdigest()[:16]
+
+# Identical PDFs (same model and prompt) skip PyMuPDF and the LLM entirely
+markdown_cache = cache_from_env()
+
+
+def extract_text_to_markdown(pdf_input: bytes | str, formatter: Formatter = "llm",
+                             incremental: bool = False) -> str:
+    with span("decode"):
+        pdf_bytes = decode_pdf_input(pdf_input)
+    if formatter == "rules":
+        return _format_markdown_with_rules(pdf_bytes)
+
+    key = content_key(pdf_bytes, LLM_MODEL, PROMPT_VERSION, *(["pages"] if incremental else []))
+    with span("cache_lookup"):
+        cached = markdown_cache.get(key)
+    if cached is not None:
+        return cached
+
+    with span("pdf_extract"):
+        pages = extract_pages(pdf_bytes)
+    with span("clean"):
+        chunks = _split_for_llm([_clean_raw_text(page) for page in pages], per_page=incremental)
+    try:
+        with span("llm"):
+            format_chunk = _format_chunk_cached if incremental else _format_markdown_with_llm
+            if len(chunks) == 1:
+                markdown = format_chunk(chunks[0])
+            else:
+                with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                    parts = executor.map(
+                        format_chunk, chunks, [(i + 1, len(chunks)) for i in range(len(chunks))]
+                    )
+                    markdown = _stitch_markdown(list(parts))
+    except Exception as e:
+        logger.warning("LLM formatting failed (%s), using rule-based formatting.", e)
+        return _format_markdown_with_rules(pdf_bytes)
+    if markdown:
+        markdown_cache.put(key, markdown)
+    return markdown
+
+
+async def extract_text_to_markdown_async(pdf_input: bytes | str, formatter: Formatter = "llm",
+                                         incremental: bool = False) -> str:
+    """Non-blocking variant: PDF parsing runs in a worker thread, the LLM call is awaited.
+
+    With incremental, every page is formatted on its own and cached by content,
+    so a re-uploaded CV only sends its new or edited pages to the LLM.
+    """
+    if isinstance(pdf_input, bytes):
+        pdf_bytes = pdf_input
+    else:
+        with span("decode"):
+            pdf_bytes = await asyncio.to_thread(decode_pdf_input, pdf_input)
+    if formatter == "rules":
+        return await asyncio.to_thread(_format_markdown_with_rules, pdf_bytes)
+
+    key = content_key(pdf_bytes, LLM_MODEL, PROMPT_VERSION, *(["pages"] if incremental else []))
+    with span("cache_lookup"):
+        cached = await asyncio.to_thread(markdown_cache.get, key)
+    if cached is not None:
+        return cached
+
+    with span("pdf_extract"):
+        pages = await asyncio.to_thread(extract_pages, pdf_bytes)
+    with span("clean"):
+        chunks = _split_for_llm([_clean_raw_text(page) for page in pages], per_page=incremental)
+    try:
+        format_chunk = _format_chunk_cached_async if incremental else _format_markdown_with_llm_async
+        with span("llm"):
+            parts = await asyncio.wait_for(
+                asyncio.gather(*(
+                    format_chunk(chunk, (i + 1, len(chunks)) if len(chunks) > 1 else None)
+                    for i, chunk in enumerate(chunks)
+                )),
+                LLM_FORMAT_TIMEOUT,
+            )
+        markdown = _stitch_markdown(parts)
+    except Exception as e:
+        # Slow or unavailable API: serve the local result instead of failing (not cached)
+        logger.warning("LLM formatting failed (%s: %s), using rule-based formatting.", type(e).__name__, e)
+        return await asyncio.to_thread(_format_markdown_with_rules, pdf_bytes)
+    if markdown:
+        await asyncio.to_thread(markdown_cache.put, key, markdown)
+    return markdown
+
+
+def _format_markdown_with_rules(pdf_bytes: bytes) -> str:
+    with span("rules_format"):
+        return structure_pdf_to_markdown(pdf_bytes, DEFAULT_SECTIONS, MAX_SECTIONS)
 
 
 def _clean_raw_text(text: str) -> str:
@@ -67,20 +173,143 @@ def _clean_raw_text(text: str) -> str:
     return "\n".join(cleaned_lines)
 
 
-def _format_markdown_with_llm(text: str) -> str:
+def _estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _split_line(line: str, token_budget: int) -> list[str]:
+    """Hard-split a line that is over token_budget on its own, at whitespace where possible."""
+    max_chars = max((token_budget - 1) * CHARS_PER_TOKEN, 1)
+    pieces: list[str] = []
+    while len(line) > max_chars:
+        cut = line.rfind(" ", 1, max_chars + 1)
+        if cut == -1:
+            cut = max_chars  # One word longer than the budget
+        pieces.append(line[:cut])
+        line = line[cut:].lstrip(" ")
+    pieces.append(line)
+    return pieces
+
+
+def _split_for_llm(pages: list[str], token_budget: int = LLM_CHUNK_TOKENS, per_page: bool = False) -> list[str]:
+    """Pack pages into chunks of at most token_budget (estimated) tokens.
+
+    Chunks break at page boundaries; a page that is too long on its own is
+    split at blank lines, then at line breaks, then within the line. With per_page, pages are never
+    packed together, so an unchanged page always yields the same chunks.
+    """
+    if per_page and len(pages) > 1:
+        return [chunk for page in pages for chunk in _split_for_llm([page], token_budget)]
+
+    units: list[str] = []
+    for page in pages:
+        if _estimate_tokens(page) <= token_budget:
+            units.append(page)
+            continue
+        for paragraph in page.split("\n\n"):
+            if _estimate_tokens(paragraph) <= token_budget:
+                units.append(paragraph)
+            else:
+                for line in paragraph.splitlines():
+                    units.extend(_split_line(line, token_budget) if _estimate_tokens(line) > token_budget else [line])
+
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = _estimate_tokens(unit)
+        if current and current_tokens + unit_tokens > token_budget:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current or not chunks:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _stitch_markdown(parts: list[str]) -> str:
+    """Join formatted chunks, merging a section that continues across a chunk boundary."""
+    lines: list[str] = []
+    last_heading: str | None = None
+    for part in parts:
+        part_lines = part.strip().splitlines()
+        continued = bool(part_lines) and part_lines[0].startswith("### ") and last_heading is not None \
+            and part_lines[0][4:].strip().lower() == last_heading
+        if continued:
+            part_lines = part_lines[1:]
+        # A continued section goes on right away, so a bullet list stays one list
+        if lines and part_lines and not continued:
+            lines.append("")
+        lines.extend(part_lines)
+        for line in part_lines:
+            if line.startswith("### "):
+                last_heading = line[4:].strip().lower()
+    return "\n".join(lines).strip()
+
+
+def _build_messages(text: str, part: tuple[int, int] | None = None) -> list[dict[str, str]]:
     payload = {
         "text": text,
         "default_sections": list(DEFAULT_SECTIONS),
         "max_sections": MAX_SECTIONS,
     }
+    if part:
+        payload["note"] = (
+            f"This is part {part[0]} of {part[1]} of a long CV. Format only this part; "
+            "start with the heading of the section it continues if it does not begin with one."
+        )
+    return [
+        {"role": "system", "content": SECTIONED_MD_SYSTEM_PROMPT},
+        {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+    ]
+
+
+def _chunk_key(text: str, part: tuple[int, int] | None) -> str:
+    # The part numbers only tell the model it sees a fragment, so they are left out
+    return content_key(text.encode("utf-8"), LLM_MODEL, PROMPT_VERSION, "part" if part else "whole")
+
 
-    completion = client.chat.completions.create(
-        model="gpt-5-mini",
-        messages=[
-            {"role": "system", "content": SECTIONED_MD_SYSTEM_PROMPT},
-            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
-        ],
+def _format_chunk_cached(text: str, part: tuple[int, int] | None = None) -> str:
+    """_format_markdown_with_llm, served from markdown_cache when this chunk was formatted before."""
+    key = _chunk_key(text, part)
+    cached = markdown_cache.get(key)
+    if cached is not None:
+        return cached
+    markdown = _format_markdown_with_llm(text, part)
+    if markdown:
+        markdown_cache.put(key, markdown)
+    return markdown
+
+
+async def _format_chunk_cached_async(text: str, part: tuple[int, int] | None = None) -> str:
+    key = _chunk_key(text, part)
+    cached = await asyncio.to_thread(markdown_cache.get, key)
+    if cached is not None:
+        return cached
+    markdown = await _format_markdown_with_llm_async(text, part)
+    if markdown:
+        await asyncio.to_thread(markdown_cache.put, key, markdown)
+    return markdown
+
+
+def _format_markdown_with_llm(text: str, part: tuple[int, int] | None = None) -> str:
+    completion = get_client().chat.completions.create(
+        model=LLM_MODEL,
+        messages=_build_messages(text, part),
+        timeout=LLM_FORMAT_TIMEOUT,
     )
 
     content = completion.choices[0].message.content or ""
     return content.strip()
+
+
+async def _format_markdown_with_llm_async(text: str, part: tuple[int, int] | None = None) -> str:
+    async with _llm_semaphore:
+        completion = await get_async_client().chat.completions.create(
+            model=LLM_MODEL,
+            messages=_build_messages(text, part),
+        )
+
+    content = completion.choices[0].message.content or ""
+    return content.strip()
@@ -0,0 +1,147 @@
+"""Incremental re-redaction: reuse NER results for paragraphs seen in an earlier upload.
+
+An applicant who re-uploads a slightly edited CV mostly resends paragraphs we
+have already parsed. The expensive detectors (spaCy NER and Presidio) run per
+paragraph, and their raw results are cached by the paragraph's content hash, so
+only new or edited paragraphs are parsed again. The cheap document-level
+detectors (patterns, applicant/header/reference names) and the filtering that
+needs the whole document (skills sections, overlap resolution) still run over
+the full text.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from markdown_cache import MarkdownCache
+from metrics import span
+from pii_redactor import (
+    PIIMatch, PIIRedactor, PIIType, PresidioRedactor, SPACY_BATCH_SIZE, get_redactor, section_map,
+)
+
+# Paragraphs are separated by blank lines
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+
+# Raw per-paragraph detector output, keyed by engine and paragraph hash
+segment_cache = MarkdownCache(
+    max_entries=int(os.getenv("SEGMENT_CACHE_SIZE", "4096")),
+    db_path=os.getenv("SEGMENT_CACHE_DB") or None,
+)
+
+
+@dataclass(frozen=True)
+class Entity:
+    """The parts of a spaCy entity NameDetector reads, shifted to document offsets."""
+    text: str
+    label_: str
+    start_char: int
+    end_char: int
+
+
+@dataclass
+class StitchedDoc:
+    """Stands in for a spaCy Doc of the whole text, built from per-paragraph entities."""
+    ents: list[Entity]
+
+
+def split_paragraphs(text: str) -> list[tuple[int, str]]:
+    """(offset, paragraph) for every paragraph with non-whitespace content."""
+    paragraphs = []
+    start = 0
+    for brk in PARAGRAPH_BREAK.finditer(text):
+        paragraphs.append((start, text[start:brk.start()]))
+        start = brk.end()
+    paragraphs.append((start, text[start:]))
+    return [(offset, paragraph) for offset, paragraph in paragraphs if paragraph.strip()]
+
+
+def _segment_key(engine: str, paragraph: str) -> str:
+    digest = hashlib.sha256(engine.encode("utf-8") + b"\0" + paragraph.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _cached_per_paragraph(engine: str, paragraphs: list[str], compute) -> list[list]:
+    """Cached results per paragraph; compute(missing paragraphs) fills the gaps in one call."""
+    keys = [_segment_key(engine, paragraph) for paragraph in paragraphs]
+    results: list[list | None] = []
+    with span("segment_cache"):
+        for key in keys:
+            cached = segment_cache.get(key)
+            results.append(json.loads(cached) if cached is not None else None)
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        for i, result in zip(missing, compute([paragraphs[i] for i in missing])):
+            results[i] = result
+            segment_cache.put(keys[i], json.dumps(result))
+    return results
+
+
+def _spacy_doc(redactor: PIIRedactor, text: str, paragraphs: list[tuple[int, str]]) -> StitchedDoc:
+    nlp = redactor.name_detector.nlp
+
+    def parse(missing: list[str]) -> list[list]:
+        with span("detect_spacy"):
+            return [
+                [[ent.label_, ent.start_char, ent.end_char] for ent in doc.ents]
+                for doc in nlp.pipe(missing, batch_size=SPACY_BATCH_SIZE)
+            ]
+
+    ents = []
+    engine = f"spacy:{nlp.meta.get('lang')}_{nlp.meta.get('name')}-{nlp.meta.get('version')}"
+    per_paragraph = _cached_per_paragraph(engine, [p for _, p in paragraphs], parse)
+    for (offset, _), paragraph_ents in zip(paragraphs, per_paragraph):
+        for label, start, end in paragraph_ents:
+            ents.append(Entity(text[offset + start:offset + end], label, offset + start, offset + end))
+    return StitchedDoc(ents)
+
+
+def _presidio_matches(redactor: PIIRedactor, text: str, paragraphs: list[tuple[int, str]]) -> list[PIIMatch]:
+    presidio = redactor.presidio_redactor
+
+    def analyze(missing: list[str]) -> list[list]:
+        with span("detect_presidio"):
+            return [
+                [[m.pii_type.value, m.start, m.end, m.confidence] for m in matches]
+                for matches in presidio.detect_batch(missing, entities=PresidioRedactor.GAP_ENTITIES)
+            ]
+
+    matches = []
+    per_paragraph = _cached_per_paragraph(f"presidio:{presidio.language}", [p for _, p in paragraphs], analyze)
+    for (offset, _), paragraph_matches in zip(paragraphs, per_paragraph):
+        for pii_type, start, end, confidence in paragraph_matches:
+            matches.append(PIIMatch(
+                text=text[offset + start:offset + end],
+                start=offset + start,
+                end=offset + end,
+                pii_type=PIIType(pii_type),
+                confidence=confidence,
+                source='PRESIDIO'
+            ))
+    return matches
+
+
+def detect_pii_incremental(redactor: PIIRedactor, text: str, applicant_name: str | None = None) -> list[PIIMatch]:
+    """redactor.detect_pii, with NER and Presidio served per paragraph from segment_cache."""
+    spacy_doc = presidio_matches = None
+    use_spacy = redactor.name_detector.use_spacy and redactor.name_detector.nlp is not None
+    if use_spacy or redactor.use_presidio:
+        # Paragraphs of the text as the engines see it, skills sections blanked
+        paragraphs = split_paragraphs(section_map(text).mask_no_pii(text))
+        if use_spacy:
+            spacy_doc = _spacy_doc(redactor, text, paragraphs)
+        if redactor.use_presidio:
+            presidio_matches = _presidio_matches(redactor, text, paragraphs)
+    return redactor.detect_pii(text, applicant_name, spacy_doc, presidio_matches)
+
+
+def redact_text_incremental(text: str, use_presidio: bool = False, applicant_name: str | None = None,
+                            use_spacy_names: bool = False) -> tuple[str, list[PIIMatch]]:
+    """redact_text, reusing cached NER results for unchanged paragraphs."""
+    redactor = get_redactor(use_presidio=use_presidio, use_spacy_names=use_spacy_names)
+    matches = detect_pii_incremental(redactor, text, applicant_name)
+    with span("redact"):
+        redacted = redactor.redact(text, matches)
+    return redacted, matches
@@ -0,0 +1,169 @@
+"""Rule-based CV structuring from PyMuPDF layout, no LLM involved.
+
+Produces the same Markdown shape as the LLM formatter in extract_text:
+`### Section` headings, paragraphs separated by blank lines and bullet
+lists, in reading order. Headings are found from font size, bold flags
+and a list of common Swedish/English CV section names.
+"""
+
+from __future__ import annotations
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Sequence
+
+# Common headings per generic section (lowercase, without trailing ':')
+SECTION_ALIASES: dict[str, tuple[str, ...]] = {
+    "Personal information": (
+        "personal information", "personuppgifter", "personliga uppgifter", "kontakt",
+        "kontaktuppgifter", "contact", "contact information", "profil", "profile",
+        "om mig", "about me", "sammanfattning", "summary",
+    ),
+    "Experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "erfarenhet", "arbetslivserfarenhet", "arbetserfarenhet", "yrkeserfarenhet",
+        "anställningar", "projekt", "projects", "uppdrag",
+    ),
+    "Education": (
+        "education", "utbildning", "utbildningar", "academic background", "studier",
+        "kurser", "courses", "certifieringar", "certifications",
+    ),
+    "Skills": (
+        "skills", "technical skills", "kompetenser", "kompetens", "färdigheter",
+        "kunskaper", "tekniska kunskaper", "språk", "languages", "verktyg", "tools",
+    ),
+    "Other": (
+        "other", "övrigt", "övriga meriter", "meriter", "ideellt engagemang",
+        "engagemang", "intressen", "interests", "fritidsintressen", "referenser",
+        "references", "referens", "reference",
+    ),
+}
+
+# Sections the LLM prompt renders as bullet lists
+BULLET_SECTIONS = ("Education", "Skills")
+
+BULLET_CHARS = "•·-–—▪●○◦*"
+_BULLET_PREFIX = re.compile(r"^[•·\-–—▪●○◦*]\s+")
+_HEADING_STRIP = re.compile(r"[\s:]+$")
+
+BOLD_FLAG = 16
+HEADING_SIZE_RATIO = 1.15
+PARAGRAPH_GAP_RATIO = 0.8
+MAX_HEADING_WORDS = 5
+
+
+@dataclass
+class _Line:
+    text: str
+    size: float
+    bold: bool
+    top: float
+    bottom: float
+
+
+def _page_lines(page) -> list[_Line]:
+    lines = []
+    for block in page.get_text("dict", sort=True)["blocks"]:
+        for line in block.get("lines", []):
+            spans = [span for span in line["spans"] if span["text"].strip()]
+            if not spans:
+                continue
+            text = " ".join(" ".join(span["text"].split()) for span in spans)
+            lines.append(_Line(
+                text=text,
+                size=max(span["size"] for span in spans),
+                bold=all(span["flags"] & BOLD_FLAG or "bold" in span["font"].lower() for span in spans),
+                top=line["bbox"][1],
+                bottom=line["bbox"][3],
+            ))
+    return lines
+
+
+def _body_size(lines: list[_Line]) -> float:
+    """Most common font size, weighted by characters."""
+    sizes: Counter[float] = Counter()
+    for line in lines:
+        sizes[round(line.size, 1)] += len(line.text)
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def _canonical_section(text: str) -> str | None:
+    key = _HEADING_STRIP.sub("", text.strip("#*_ ")).lower()
+    for section, aliases in SECTION_ALIASES.items():
+        if key == section.lower() or key in aliases:
+            return section
+    return None
+
+
+def _is_heading(line: _Line, body_size: float) -> bool:
+    words = line.text.split()
+    if not words or len(words) > MAX_HEADING_WORDS or any(ch.isdigit() for ch in line.text):
+        return False
+    if _canonical_section(line.text):
+        return True
+    if line.text.rstrip().endswith((".", ",")):
+        return False
+    larger = body_size and line.size >= body_size * HEADING_SIZE_RATIO
+    shouting = line.bold and line.text.isupper()
+    return bool(larger or shouting)
+
+
+def structure_pdf_to_markdown(
+    pdf_bytes: bytes,
+    default_sections: Sequence[str],
+    max_sections: int,
+) -> str:
+    """Turn a CV PDF into sectioned Markdown using layout only."""
+    import pymupdf
+
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        pages = [_page_lines(page) for page in doc]
+
+    body_size = _body_size([line for lines in pages for line in lines])
+    out: list[str] = []
+    sections = 0
+    current_section: str | None = None
+    pending_bullet = False
+
+    def start_section(title: str) -> None:
+        nonlocal sections, current_section
+        if out:
+            out.append("")
+        out.append(f"### {title}")
+        sections += 1
+        current_section = _canonical_section(title)
+
+    for lines in pages:
+        previous: _Line | None = None
+        for line in lines:
+            text = line.text.strip()
+
+            # Bullet glyph on its own line: the bullet text follows
+            if text and all(ch in BULLET_CHARS for ch in text.replace(" ", "")):
+                pending_bullet = True
+                continue
+
+            # A large first line is usually the applicant's name, not a section
+            is_heading = _is_heading(line, body_size) and (out or _canonical_section(text))
+            if is_heading and sections < max_sections:
+                start_section(_HEADING_STRIP.sub("", text.strip("#*_ ")))
+                previous, pending_bullet = line, False
+                continue
+
+            if not out:
+                # Text before the first heading is the CV header
+                start_section(default_sections[0])
+            elif previous is not None:
+                gap = line.top - previous.bottom
+                if gap > previous.size * PARAGRAPH_GAP_RATIO and out[-1] and not out[-1].startswith("### "):
+                    out.append("")
+
+            bullet = _BULLET_PREFIX.match(text)
+            if bullet:
+                text = text[bullet.end():]
+            if bullet or pending_bullet or current_section in BULLET_SECTIONS:
+                text = f"- {text}"
+            out.append(text)
+            previous, pending_bullet = line, False
+
+    return "\n".join(out).strip()
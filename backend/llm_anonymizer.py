@@ -1,49 +1,80 @@
+from __future__ import annotations
 import os
+import re
 import json
-import pymupdf
-from dotenv import load_dotenv
-from openai import OpenAI
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+import numpy as np
+from llm_client import get_client
+from metrics import span
+from layout_markdown import SECTION_ALIASES
+from pii_redactor import NameDetector, get_redactor
+
+if TYPE_CHECKING:
+    import pymupdf
 
 # our server takes a base64 PDF → this code turns it into words → GPT marks which word IDs are sensitive 
 # → PyMuPDF draws black boxes over those IDs + all images → you send back the new PDF as base64.
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-openai_key = os.getenv("OPENAI_API_KEY")
-if not openai_key:
-    raise RuntimeError("OPENAI_API_KEY is not set in .env")
+# Max pages sent to the LLM at the same time (provider rate limits)
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+# "compact" sends one "index<TAB>word" row per word, "json" the original word objects
+LLM_PROMPT_FORMAT = os.getenv("LLM_PROMPT_FORMAT", "compact")
+# "llm": the LLM decides every page; "hybrid": local rules redact what they find and the
+# LLM only sees lines they leave uncertain; "local": local rules only, no LLM calls
+LLM_REDACTION_MODE = os.getenv("LLM_REDACTION_MODE", "llm")
+REDACTION_MODES = ("llm", "hybrid", "local")
 
-client = OpenAI(api_key=openai_key)
+# One row per word; the word's integer ID is its row index within the page
+WORD_DTYPE = np.dtype([
+    ("x0", "f4"), ("y0", "f4"), ("x1", "f4"), ("y1", "f4"),
+    ("block", "i4"), ("line", "i4"),
+])
 
-def extract_words_with_positions(pdf_bytes: bytes):
-    """Return list of pages with word positions and IDs."""
-    doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
-    pages = []
+WORD_ID = re.compile(r"^p(\d+)w(\d+)$")
 
-    for page_index, page in enumerate(doc):
-        word_infos = []
-        for idx, (x0, y0, x1, y1, text, *_rest) in enumerate(page.get_text("words")):
-            word_infos.append(
-                {
-                    "id": f"p{page_index}w{idx}",
-                    "text": text,
-                    "x0": x0,
-                    "y0": y0,
-                    "x1": x1,
-                    "y1": y1,
-                }
-            )
-        pages.append({"page": page_index, "words": word_infos})
+# Neighbouring redacted words further apart than this many line heights get separate boxes
+MAX_MERGE_GAP = 1.0
 
-    return pages
 
+@dataclass
+class PageWords:
+    """Words of one page as parallel arrays: texts[i] sits at words[i]."""
+    page: int
+    texts: list[str]
+    words: np.ndarray  # WORD_DTYPE
 
-SYSTEM_PROMPT = """
-You are an expert CV anonymizer. The CV text is usually in Swedish.
-You receive ALL words of a CV as JSON, one page at a time.
+    def word_id(self, index: int) -> str:
+        return f"p{self.page}w{index}"
+
+
+def extract_words_with_positions(pdf: bytes | pymupdf.Document) -> list[PageWords]:
+    """Return the words and their positions for every page.
+
+    Accepts an open document (left open for the caller) or raw PDF bytes
+    (opened and closed here).
+    """
+    import pymupdf
+
+    if isinstance(pdf, (bytes, bytearray)):
+        with pymupdf.open(stream=pdf, filetype="pdf") as doc:
+            return extract_words_with_positions(doc)
+
+    pages = []
+    for page_index, page in enumerate(pdf):
+        raw = page.get_text("words")
+        words = np.array([(x0, y0, x1, y1, block, line) for x0, y0, x1, y1, _, block, line, _ in raw],
+                         dtype=WORD_DTYPE)
+        pages.append(PageWords(page_index, [w[4] for w in raw], words))
+    return pages
 
-Your task: return ONLY the IDs of words that clearly contain personal identifiers.
 
+# What to redact, shared by both prompt formats
+REDACTION_RULES = """
 REDACT (only if clearly personal to the candidate):
 - the candidate's full name or initials that identify the person
 - phone numbers (e.g. 070-123 45 67, +46 70 123 45 67)
@@ -72,7 +103,14 @@ If you are unsure whether something is personal information, DO NOT redact it.
 On a typical CV page, personal identifiers are a very small fraction of the words (often less than 5% of all words on the page). 
 If you find yourself wanting to redact a large portion of the page, you have misunderstood the task: in that case, return an empty list.
 
-Very important:
+"""
+
+SYSTEM_PROMPT = """
+You are an expert CV anonymizer. The CV text is usually in Swedish.
+You receive ALL words of a CV as JSON, one page at a time.
+
+Your task: return ONLY the IDs of words that clearly contain personal identifiers.
+""" + REDACTION_RULES + """Very important:
 1) Output ONLY a single JSON object.
 2) No explanations, no markdown, no code fences.
 3) Use exactly this structure:
@@ -81,86 +119,328 @@ Very important:
    { "redact_ids": [] }
 """
 
+COMPACT_SYSTEM_PROMPT = """
+You are an expert CV anonymizer. The CV text is usually in Swedish.
+You receive the words of one CV page, one word per row as: index<TAB>word
+A blank row separates the lines of the page. Lines that cannot hold personal identifiers may be left out.
 
+Your task: return ONLY the indexes of words that clearly contain personal identifiers.
+""" + REDACTION_RULES + """Very important:
+1) Output ONLY a single JSON object.
+2) No explanations, no markdown, no code fences.
+3) Use exactly this structure:
+   { "redact": [0, 5, ...] }
+4) If there is no personal information on the page, return:
+   { "redact": [] }
+"""
 
-
-def ask_llm_for_redactions(pages):
+# Words that may be (part of) an identifier: digits, e-mail or handle, URL...
+_CONTACT_WORD = re.compile(r"[\d@/]|www\.|\.(?:com|se|nu|io|net|org)\b")
+# ...or a capitalized word that could be a name
+_CAPITALIZED_WORD = re.compile(r"^\W*[A-ZÅÄÖÉÜ]")
+_WORD_PUNCTUATION = ".,:;!?()[]*\"'•–-"
+_HEADING_SECTION = {
+    heading: section
+    for section, aliases in SECTION_ALIASES.items()
+    for heading in (section.lower(), *aliases)
+}
+# Sections whose capitalized words are schools, degrees and skills rather than names
+_NO_NAME_SECTIONS = ("Education", "Skills")
+_YEAR = re.compile(r"^\W*(?:19|20)\d{2}\W*$")
+_BULLETS = ("-", "–", "•", "*")
+
+
+def page_lines(page: PageWords) -> list[range]:
+    """Word index ranges of the page's lines, in reading order."""
+    words = page.words
+    if not len(words):
+        return []
+    breaks = (words["block"][1:] != words["block"][:-1]) | (words["line"][1:] != words["line"][:-1])
+    starts = np.flatnonzero(np.concatenate(([True], breaks))).tolist()
+    return [range(start, end) for start, end in zip(starts, starts[1:] + [len(words)])]
+
+
+def _line_heading(texts: list[str]) -> str | None:
+    """The section a line opens, if it is a section heading."""
+    line = " ".join(text for text in texts if text.strip(_WORD_PUNCTUATION))
+    return _HEADING_SECTION.get(line.strip(_WORD_PUNCTUATION).lower())
+
+
+def _candidate_words(texts: list[str]) -> list[int]:
+    """Positions of the words in a line that may be (part of) an identifier.
+
+    Errs on the side of candidates: a line is only clean if no word could be one.
+    """
+    if _line_heading(texts):
+        return []
+
+    words = [i for i, text in enumerate(texts) if text.strip(_WORD_PUNCTUATION)]
+    candidates = []
+    for n, i in enumerate(words):
+        text = texts[i]
+        if _CONTACT_WORD.search(text):
+            candidates.append(i)
+        # The value of a field ("github: annasv", "github:annasv") may be a lowercase handle
+        elif (n > 0 and texts[words[n - 1]].endswith(":")) or ":" in text.strip(_WORD_PUNCTUATION):
+            candidates.append(i)
+        # Any capital may start a name, also at the start of a sentence ("Anna är ...")
+        elif _CAPITALIZED_WORD.match(text) and text.strip(_WORD_PUNCTUATION).lower() not in NameDetector.STOPWORDS:
+            candidates.append(i)
+    return candidates
+
+
+def build_page_prompt(page: PageWords, lines: list[range], prompt_format: str | None = None) -> str:
+    """User message for one page in the compact (index<TAB>word) or JSON format."""
+    if (prompt_format or LLM_PROMPT_FORMAT) == "compact":
+        return "\n\n".join("\n".join(f"{i}\t{page.texts[i]}" for i in line) for line in lines)
+    return json.dumps({
+        "page": page.page,
+        "words": [{"id": page.word_id(i), "text": page.texts[i]} for line in lines for i in line],
+    }, ensure_ascii=False)
+
+
+def local_redactions(page: PageWords, applicant_name: str | None = None) -> np.ndarray:
+    """Sorted indices of the words the local detectors (patterns and names) flag on a page."""
+    lines = page_lines(page)
+    if not lines:
+        return _NO_WORDS
+
+    # Rebuild the page text one PDF line per text line, remembering where each word starts
+    starts = np.empty(len(page.texts), dtype=np.int64)
+    offset = 0
+    for line in lines:
+        for i in line:
+            starts[i] = offset
+            offset += len(page.texts[i]) + 1
+    ends = starts + np.fromiter((len(text) for text in page.texts), dtype=np.int64, count=len(page.texts))
+    text = "\n".join(" ".join(page.texts[line.start:line.stop]) for line in lines)
+
+    indices = [
+        np.arange(np.searchsorted(ends, match.start, side="right"), np.searchsorted(starts, match.end))
+        for match in get_redactor().detect_pii(text, applicant_name)
+    ]
+    return np.unique(np.concatenate(indices)) if indices else _NO_WORDS
+
+
+def uncertain_words(texts: list[str], covered, section: str | None = None) -> list[int]:
+    """Positions of the possible identifiers on a line that the local rules did not redact.
+
+    covered[i] is whether texts[i] was redacted locally. Not counted: years, tech
+    terms, field labels ("Telefon:"), the verb opening a bullet ("- Byggde ..."),
+    the employer after a date range ("2015 - 2018 IKEA"), the role after a redacted
+    name ("█ █ (Gruppchef, Saab)") and capitalized words in the education and
+    skills sections. Companies and organizations are never redacted.
+    """
+    words = [i for i, text in enumerate(texts) if text.strip(_WORD_PUNCTUATION)]
+    if not words:
+        return []
+    bullet_verb = (
+        len(words) > 1 and words[0] > 0 and texts[words[0] - 1] in _BULLETS
+        and texts[words[1]][:1].islower()
+    )
+    dated = bool(_YEAR.match(texts[words[0]]))
+    # Parenthesized words right after a redacted word describe that person
+    role = np.zeros(len(texts), dtype=bool)
+    in_role = False
+    for n, i in enumerate(words):
+        if texts[i].startswith("(") and n > 0 and covered[words[n - 1]]:
+            in_role = True
+        role[i] = in_role
+        if texts[i].endswith(")"):
+            in_role = False
+
+    uncertain = []
+    for position in _candidate_words(texts):
+        text = texts[position]
+        if covered[position] or _YEAR.match(text):
+            continue
+        if not _CONTACT_WORD.search(text) and (
+            section in _NO_NAME_SECTIONS or NameDetector.TECH_TERM.match(text)
+            or text.endswith(":") or (bullet_verb and position == words[0]) or dated or role[position]
+        ):
+            continue
+        uncertain.append(position)
+    return uncertain
+
+
+def uncertain_lines(page: PageWords, redacted: np.ndarray) -> list[range]:
+    """Lines holding a possible identifier that the local rules did not redact."""
+    covered = np.zeros(len(page.texts), dtype=bool)
+    covered[redacted] = True
+    section = None
+    uncertain = []
+    for line in page_lines(page):
+        texts = page.texts[line.start:line.stop]
+        heading = _line_heading(texts)
+        if heading:
+            section = heading
+        elif uncertain_words(texts, covered[line.start:line.stop], section):
+            uncertain.append(line)
+    return uncertain
+
+
+def ask_llm_for_redactions(
+    pages: list[PageWords],
+    max_in_flight: int = LLM_MAX_IN_FLIGHT,
+    lines: list[list[range]] | None = None,
+) -> list[np.ndarray]:
     """
     pages: output from extract_words_with_positions
-    returns: list of word IDs to redact across ALL pages
+    max_in_flight: number of pages sent to the LLM concurrently (1 = sequential)
+    lines: per page, the lines to send (default: every line)
+    returns: for each page, in page order, the sorted word indices to redact
     """
-    all_redact_ids = []
-
-    for page in pages:
-        simple_page = {
-            "page": page["page"],
-            "words": [
-                {"id": w["id"], "text": w["text"]}
-                for w in page["words"]
-            ],
-        }
-
-        user_content = json.dumps(simple_page, ensure_ascii=False)
-
-        completion = client.chat.completions.create(
-            model="gpt-5-mini",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_content},
-            ],
-        )
-
-        raw = completion.choices[0].message.content or ""
-        print(f"GPT raw response for page {page['page']}:", repr(raw))
-
-        # Try to parse JSON
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            start = raw.find("{")
-            end = raw.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                try:
-                    data = json.loads(raw[start : end + 1])
-                except json.JSONDecodeError:
-                    print(f"Failed to parse JSON for page {page['page']}. Skipping.")
-                    continue
-            else:
-                print(f"No JSON object found in LLM output for page {page['page']}. Skipping.")
-                continue
-
-        redact_ids = data.get("redact_ids", [])
-        if isinstance(redact_ids, list):
-            all_redact_ids.extend(str(rid) for rid in redact_ids)
+    if lines is None:
+        lines = [None] * len(pages)
+    if max_in_flight <= 1 or len(pages) <= 1:
+        return [_ask_llm_for_page(page, page_line_ranges) for page, page_line_ranges in zip(pages, lines)]
+
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(pages))) as executor:
+        # map() yields results in input order, so the merge is deterministic
+        return list(executor.map(_ask_llm_for_page, pages, lines))
+
+
+def _ask_llm_for_page(page: PageWords, lines: list[range] | None = None) -> np.ndarray:
+    """Ask the LLM for the words to redact on a single page."""
+    if lines is None:
+        lines = page_lines(page)
+    if not lines:
+        logger.debug("Nothing on page %d can be personal information, skipping the LLM.", page.page)
+        return _NO_WORDS
+
+    compact = LLM_PROMPT_FORMAT == "compact"
+    completion = get_client().chat.completions.create(
+        model="gpt-5-mini",
+        messages=[
+            {"role": "system", "content": COMPACT_SYSTEM_PROMPT if compact else SYSTEM_PROMPT},
+            {"role": "user", "content": build_page_prompt(page, lines)},
+        ],
+    )
+
+    raw = completion.choices[0].message.content or ""
+    logger.debug("GPT raw response for page %d: %r", page.page, raw)
+
+    # Try to parse JSON
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        start = raw.find("{")
+        end = raw.rfind("}")
+        if start != -1 and end != -1 and end > start:
+            try:
+                data = json.loads(raw[start : end + 1])
+            except json.JSONDecodeError:
+                logger.warning("Failed to parse JSON for page %d. Skipping.", page.page)
+                return _NO_WORDS
         else:
-            print(f"redact_ids is not a list on page {page['page']}. Skipping.")
+            logger.warning("No JSON object found in LLM output for page %d. Skipping.", page.page)
+            return _NO_WORDS
+
+    redact_ids = data.get("redact" if compact else "redact_ids", [])
+    if not isinstance(redact_ids, list):
+        logger.warning("Redaction list is not a list on page %d. Skipping.", page.page)
+        return _NO_WORDS
+
+    return _word_indices(page, redact_ids, {i for line in lines for i in line})
+
 
-    return all_redact_ids
+_NO_WORDS = np.empty(0, dtype=np.int64)
 
 
-def anonymize_pdf_with_llm(pdf_bytes: bytes) -> bytes:
+def _word_indices(page: PageWords, redact_ids: list, sent: set[int]) -> np.ndarray:
+    """Map indexes or "p{page}w{index}" IDs back to word indices, keeping only words that were sent."""
+    indices = set()
+    for rid in redact_ids:
+        match = WORD_ID.match(str(rid))
+        if match and int(match.group(1)) == page.page:
+            index = int(match.group(2))
+        elif isinstance(rid, int) or str(rid).isdigit():
+            index = int(rid)
+        else:
+            index = None
+
+        if index in sent:
+            indices.add(index)
+        else:
+            logger.warning("Ignoring unknown word ID %r on page %d.", rid, page.page)
+    return np.array(sorted(indices), dtype=np.int64)
+
+
+def merge_word_rects(words: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Merge the selected words into one (x0, y0, x1, y1) row per run on a line.
+
+    indices must be sorted. A run only grows over words that follow each other
+    in reading order on the same line, so an unselected word in between always
+    splits it and is never covered.
+    """
+    if not len(indices):
+        return np.empty((0, 4), dtype=np.float32)
+
+    selected = words[indices]
+    x0, y0, x1, y1 = selected["x0"], selected["y0"], selected["x1"], selected["y1"]
+    height = np.maximum(y1 - y0, 1.0)
+
+    starts = np.ones(len(selected), dtype=bool)
+    starts[1:] = (
+        (np.diff(indices) != 1)
+        | (selected["block"][1:] != selected["block"][:-1])
+        | (selected["line"][1:] != selected["line"][:-1])
+        | (x0[1:] - x1[:-1] > MAX_MERGE_GAP * np.maximum(height[1:], height[:-1]))
+    )
+    runs = np.flatnonzero(starts)
+    return np.column_stack((
+        np.minimum.reduceat(x0, runs),
+        np.minimum.reduceat(y0, runs),
+        np.maximum.reduceat(x1, runs),
+        np.maximum.reduceat(y1, runs),
+    ))
+
+
+def anonymize_pdf_with_llm(pdf_bytes: bytes, applicant_name: str | None = None, mode: str | None = None) -> bytes:
     """
     Main entry point used by server.py
     Takes raw PDF bytes, returns anonymized PDF bytes.
+    mode: "llm", "hybrid" or "local" (default: LLM_REDACTION_MODE)
     """
-    # extract all words/positions from PDF
-    pages = extract_words_with_positions(pdf_bytes)
+    mode = mode or LLM_REDACTION_MODE
+    if mode not in REDACTION_MODES:
+        raise ValueError(f"Unknown redaction mode {mode!r}, expected one of {', '.join(REDACTION_MODES)}")
+    import pymupdf
+
+    # parse the PDF once; closed as soon as the redacted copy is written
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        # extract all words/positions from PDF
+        with span("pdf_words"):
+            pages = extract_words_with_positions(doc)
+
+        if mode == "llm":
+            # ask LLM which words to redact (per page)
+            with span("llm_redaction"):
+                redactions = ask_llm_for_redactions(pages)
+        else:
+            with span("local_redaction"):
+                redactions = [local_redactions(page, applicant_name) for page in pages]
+            if mode == "hybrid":
+                # only lines the local rules left uncertain; pages without any skip the LLM
+                uncertain = [uncertain_lines(page, redacted) for page, redacted in zip(pages, redactions)]
+                with span("llm_redaction"):
+                    llm_redactions = ask_llm_for_redactions(pages, lines=uncertain)
+                redactions = [np.union1d(local, llm) for local, llm in zip(redactions, llm_redactions)]
 
-    # ask LLM which word IDs to redact (across all pages)
-    redact_ids = set(ask_llm_for_redactions(pages))
+        with span("pdf_redaction"):
+            return _apply_redactions(doc, pages, redactions)
 
-    # re-open the PDF and apply redactions
-    doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
 
-    for page_info in pages:
-        page_index = page_info["page"]
-        page = doc[page_index]
+def _apply_redactions(doc: pymupdf.Document, pages: list[PageWords], redactions: list[np.ndarray]) -> bytes:
+    """Black out the selected words and every image, returns the new PDF bytes."""
+    import pymupdf
 
-        # Redact text tokens selected by LLM
-        for w in page_info["words"]:
-            if w["id"] in redact_ids:
-                rect = pymupdf.Rect(w["x0"], w["y0"], w["x1"], w["y1"])
-                page.add_redact_annot(rect, fill=(0, 0, 0))
+    for page_words, indices in zip(pages, redactions):
+        page = doc[page_words.page]
+
+        # Redact text tokens selected by LLM, one box per run of words on a line
+        for x0, y0, x1, y1 in merge_word_rects(page_words.words, indices).tolist():
+            page.add_redact_annot(pymupdf.Rect(x0, y0, x1, y1), fill=(0, 0, 0))
 
         # Redact ALL images on this page
         for img in page.get_images(full=True):
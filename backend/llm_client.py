@@ -0,0 +1,34 @@
+"""Shared OpenAI clients, created on first use to keep imports cheap."""
+
+from __future__ import annotations
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+load_dotenv()
+
+
+def _api_key() -> str:
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if not openai_key:
+        raise RuntimeError("OPENAI_API_KEY is not set in .env")
+    return openai_key
+
+
+@lru_cache(maxsize=None)
+def get_client() -> OpenAI:
+    from openai import OpenAI
+
+    return OpenAI(api_key=_api_key())
+
+
+@lru_cache(maxsize=None)
+def get_async_client() -> AsyncOpenAI:
+    """Shared async client; its connection pool is reused by every request."""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=_api_key())
@@ -0,0 +1,166 @@
+"""Content-addressed cache for LLM-formatted CV Markdown."""
+
+from __future__ import annotations
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_key(pdf_bytes: bytes, *parts: str) -> str:
+    """SHA-256 over the PDF bytes and anything else the output depends on."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(pdf_bytes)
+    return digest.hexdigest()
+
+
+class MarkdownCache:
+    """Two-tier cache: an in-memory LRU in front of an optional SQLite file.
+
+    The SQLite tier survives restarts and is shared by workers on the same
+    host. Entries older than ttl_seconds are ignored and purged in both
+    tiers, and the
+    least recently used rows are evicted once the stored Markdown exceeds
+    max_bytes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        db_path: str | None = None,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_bytes: int = 100 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()  # key -> (markdown, created)
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS markdown_cache ("
+                " key TEXT PRIMARY KEY,"
+                " markdown TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                markdown, created = entry
+                if time.time() - created <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return markdown
+                del self._memory[key]
+
+            row = self._disk_get(key)
+            if row is not None:
+                markdown, created = row
+                self._memory_put(key, markdown, created)
+                self.disk_hits += 1
+                return markdown
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, markdown: str) -> None:
+        with self._lock:
+            now = time.time()
+            self._memory_put(key, markdown, now)
+            self._disk_put(key, markdown, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM markdown_cache")
+                self._db.commit()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def _memory_put(self, key: str, markdown: str, created: float) -> None:
+        self._memory[key] = (markdown, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> tuple[str, float] | None:
+        """(markdown, created) of a live row, None if missing or expired."""
+        if self._db is None:
+            return None
+        now = time.time()
+        row = self._db.execute(
+            "SELECT markdown, created FROM markdown_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        markdown, created = row
+        if now - created > self.ttl_seconds:
+            self._db.execute("DELETE FROM markdown_cache WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        self._db.execute("UPDATE markdown_cache SET accessed = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        return markdown, created
+
+    def _disk_put(self, key: str, markdown: str, now: float) -> None:
+        if self._db is None:
+            return
+        size = len(markdown.encode("utf-8"))
+        self._db.execute(
+            "INSERT OR REPLACE INTO markdown_cache (key, markdown, size, created, accessed)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, markdown, size, now, now),
+        )
+        self._evict(now)
+        self._db.commit()
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM markdown_cache WHERE created < ?", (now - self.ttl_seconds,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM markdown_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM markdown_cache ORDER BY accessed").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM markdown_cache WHERE key = ?", stale)
+
+
+def cache_from_env() -> MarkdownCache:
+    """Build the cache from MARKDOWN_CACHE_* environment variables."""
+    return MarkdownCache(
+        max_entries=int(os.getenv("MARKDOWN_CACHE_SIZE", "256")),
+        db_path=os.getenv("MARKDOWN_CACHE_DB") or None,
+        ttl_seconds=float(os.getenv("MARKDOWN_CACHE_TTL", str(7 * 24 * 3600))),
+        max_bytes=int(os.getenv("MARKDOWN_CACHE_MAX_BYTES", str(100 * 1024 * 1024))),
+    )
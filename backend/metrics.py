@@ -0,0 +1,90 @@
+"""Per-stage latency spans and Prometheus-style histograms for the pipeline."""
+
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Sequence
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one label, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, label: str,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[str, list[float]] = {}  # label value -> bucket counts + [sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, seconds: float) -> None:
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, series in sorted(self._series.items()):
+                label = f'{self.label}="{label_value}"'
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {count:.0f}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series[-1]:.0f}')
+                lines.append(f"{self.name}_sum{{{label}}} {series[-2]}")
+                lines.append(f"{self.name}_count{{{label}}} {series[-1]:.0f}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "anonymize_stage_seconds", "Time spent in each anonymization pipeline stage.", "stage"
+)
+REQUEST_SECONDS = Histogram(
+    "anonymize_request_seconds", "End-to-end HTTP request time per endpoint.", "endpoint"
+)
+
+# Stage timings of the request being handled (None outside a request)
+_request_timings: ContextVar[dict[str, float] | None] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> dict[str, float]:
+    """Start collecting stage timings for the current request context."""
+    timings: dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a pipeline stage into STAGE_SECONDS and the current request's timings."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(stage, elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def server_timing_header(timings: dict[str, float]) -> str:
+    """Format timings as a Server-Timing header value (durations in ms)."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+def render_metrics() -> str:
+    lines = STAGE_SECONDS.render() + REQUEST_SECONDS.render()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,59 @@
+"""Group concurrent calls from the event loop into one batched call in a worker thread."""
+
+from __future__ import annotations
+import asyncio
+import contextvars
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects submitted items until max_batch_size or max_wait seconds, then runs
+    process(items) once in a thread and hands each caller its own result.
+
+    process must return one result per item, in order.
+    """
+
+    def __init__(self, process: Callable[[list[T]], list[R]], max_batch_size: int = 16, max_wait: float = 0.01):
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: list[tuple[T, asyncio.Future[R]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()  # keeps batch tasks alive until done
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            # Own context: the batch's stage timings must not land on whichever request came first
+            self._timer = loop.call_later(self.max_wait, self._flush, context=contextvars.Context())
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch), context=contextvars.Context())
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future[R]]]) -> None:
+        try:
+            results = await asyncio.to_thread(self.process, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
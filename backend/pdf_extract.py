@@ -1,17 +1,27 @@
 import base64
 import os
-import pymupdf 
+
+def decode_pdf_input(pdf_input: bytes | str) -> bytes:
+    """Return raw PDF bytes given bytes or a base64-encoded string."""
+    if isinstance(pdf_input, str):
+        return base64.b64decode(pdf_input)
+    return pdf_input
+
 
 def extract_text(pdf_input: bytes | str) -> str:
     """Extract text from a PDF given bytes or a base64-encoded string."""
-    if isinstance(pdf_input, str):
-        pdf_bytes = base64.b64decode(pdf_input)
-    else:
-        pdf_bytes = pdf_input
+    return "\n".join(extract_pages(pdf_input))
+
+
+def extract_pages(pdf_input: bytes | str) -> list[str]:
+    """Extract the text of each page from a PDF given bytes or a base64-encoded string."""
+    import pymupdf  # Imported on first use to keep server start-up fast
+
+    pdf_bytes = decode_pdf_input(pdf_input)
 
     # ensure we always close the document
     with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
-        return "\n".join(page.get_text() for page in doc)
+        return [page.get_text() for page in doc]
 
 
 def test(folder_path: str) -> None:
@@ -2,10 +2,15 @@
 Simplified PII Redaction System
 Focuses on reliability over complexity
 """
+import os
 import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
+from metrics import span
 
 
 class PIIType(Enum):
@@ -36,6 +41,256 @@ class PIIMatch:
         return not (self.end <= other.start or self.start >= other.end)
 
 
+# Tie-break between overlapping matches of equal confidence (lower wins)
+SOURCE_PRIORITY = {
+    'PATTERN': 0,
+    'NAME_APPLICANT': 1,
+    'NAME_APPLICANT_PART': 2,
+    'NAME_REFERENCE': 3,
+    'NAME_HEADER': 4,
+    'NAME_SPACY': 5,
+    'PRESIDIO': 6,
+}
+
+
+def _rank(match: PIIMatch) -> tuple:
+    """Sort key for choosing between overlapping matches (smallest wins)"""
+    return (
+        -match.confidence,
+        SOURCE_PRIORITY.get(match.source, len(SOURCE_PRIORITY)),
+        match.start,
+        match.start - match.end,
+    )
+
+
+def resolve_overlaps(matches: List[PIIMatch]) -> List[PIIMatch]:
+    """
+    Merge overlapping matches into non-overlapping ones, ordered by start.
+    
+    Every group of overlapping matches becomes one match covering their union,
+    so a short match inside a longer one never leaves the rest of the longer
+    one in the clear. The group's type, confidence and source come from its
+    best match - highest confidence, then SOURCE_PRIORITY, then earliest
+    start, then longest. Used by every detector so conflicts resolve the
+    same way.
+    """
+    resolved = []
+    group: List[PIIMatch] = []
+    group_end = -1
+    for match in sorted(matches, key=lambda m: (m.start, -m.end)):
+        if group and match.start >= group_end:
+            resolved.append(_merge_group(group))
+            group = []
+        group_end = max(group_end, match.end) if group else match.end
+        group.append(match)
+    if group:
+        resolved.append(_merge_group(group))
+    return resolved
+
+
+def _merge_group(group: List[PIIMatch]) -> PIIMatch:
+    """One match spanning an overlapping group (sorted by start), labelled by its best match"""
+    if len(group) == 1:
+        return group[0]
+    best = min(group, key=_rank)
+    # The group is a chain of overlaps, so each match's text continues the union's
+    text = group[0].text
+    end = group[0].end
+    for match in group[1:]:
+        if match.end > end:
+            text += match.text[end - match.start:]
+            end = match.end
+    return PIIMatch(
+        text=text,
+        start=group[0].start,
+        end=end,
+        pii_type=best.pii_type,
+        confidence=best.confidence,
+        source=best.source
+    )
+
+
+@dataclass
+class RedactedSpan:
+    """A redaction label in the redacted text and the original span it replaced"""
+    redacted_start: int
+    redacted_end: int
+    original_start: int
+    original_end: int
+    pii_type: PIIType
+
+
+def _build_fold_table() -> Dict[int, str]:
+    """Lowercase and strip diacritics char-by-char (length preserving)"""
+    table = {}
+    for code in range(0x250):
+        char = chr(code)
+        lower = char.lower()
+        if len(lower) != 1:
+            lower = char
+        base = unicodedata.normalize('NFD', lower)[0]
+        if base != char:
+            table[code] = base
+    # Scandinavian letters without a decomposition
+    table.update({ord('ø'): 'o', ord('Ø'): 'o', ord('æ'): 'a', ord('Æ'): 'a'})
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold_diacritics(text: str) -> str:
+    """Case- and diacritic-insensitive form of text (å/ä -> a, ö -> o)
+    
+    Every character maps to exactly one character, so offsets in the folded
+    text are valid in the original.
+    """
+    return text.translate(_FOLD_TABLE)
+
+
+def trie_pattern(words: List[str]) -> str:
+    """Regex alternation for words, factored into a prefix trie
+    
+    The regex engine then walks shared prefixes once instead of trying every
+    word at each position, and longer words win over their prefixes.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return '(?:' + body + ')?'
+        return body
+    
+    return build(trie)
+
+
+@lru_cache(maxsize=1024)
+def _applicant_name_pattern(applicant_name: str) -> "re.Pattern[str]":
+    """One compiled matcher for the full applicant name and its parts
+    
+    Matches folded text; the full name wins over a part starting at the same
+    position. IGNORECASE covers letters the fold table doesn't (e.g. Cyrillic,
+    Vietnamese).
+    """
+    folded = fold_diacritics(applicant_name)
+    parts = [p for p in folded.split() if len(p) >= 3]  # Skip initials
+    pattern = '(?P<full>' + re.escape(folded) + ')'
+    if parts:
+        # Word boundary match to avoid partial matches
+        pattern += r'|\b(?P<part>' + trie_pattern(parts) + r')\b'
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class SectionMap:
+    """Markdown sections and skills-indicator hits of one text, built in one pass
+    
+    Answers "is this offset inside a skills section" with bisect lookups
+    instead of rescanning the text before every entity.
+    """
+    
+    HEADING = re.compile(r'^#{1,6}[ \t]*(.*?)[ \t#]*$', re.MULTILINE)
+    
+    # Skills section indicators
+    SKILL_INDICATORS = (
+        'färdigheter', 'skills', 'teknisk', 'technical',
+        'utvecklingsspråk', 'programming', 'languages',
+        'utvecklingsmiljöer', 'tools', 'technologies',
+        'kompetens', 'competence', 'erfarenhet av'
+    )
+    # An indicator this many characters before a position marks it as skills
+    SKILL_WINDOW = 500
+    
+    def __init__(self, text: str):
+        self.length = len(text)
+        
+        # Section starts, the preamble before the first heading included
+        self.section_starts = [0]
+        self.skill_sections = [False]
+        for heading in self.HEADING.finditer(text):
+            self.section_starts.append(heading.start())
+            self.skill_sections.append(_is_skill_heading(heading.group(1)))
+        
+        # Indicator hits by start, with the smallest end from each hit onwards
+        hits = sorted(
+            (match.start(), match.end())
+            for pattern in _skill_indicator_patterns()
+            for match in pattern.finditer(text)
+        )
+        self.hit_starts = [start for start, _ in hits]
+        self.min_end_from = [0] * len(hits)
+        smallest = self.length + 1
+        for i in range(len(hits) - 1, -1, -1):
+            smallest = min(smallest, hits[i][1])
+            self.min_end_from[i] = smallest
+    
+    def section_index(self, position: int) -> int:
+        return bisect_right(self.section_starts, position) - 1
+    
+    def in_skill_section(self, position: int) -> bool:
+        """Under a skills heading, or an indicator in the SKILL_WINDOW characters before"""
+        if self.skill_sections[self.section_index(position)]:
+            return True
+        i = bisect_left(self.hit_starts, position - self.SKILL_WINDOW)
+        return i < len(self.hit_starts) and self.min_end_from[i] <= position
+    
+    def no_pii_spans(self) -> List[tuple]:
+        """(start, end) of the sections that can't contain PII (skills sections)"""
+        ends = self.section_starts[1:] + [self.length]
+        return [
+            (start, end)
+            for start, end, skills in zip(self.section_starts, ends, self.skill_sections)
+            if skills
+        ]
+    
+    def mask_no_pii(self, text: str) -> str:
+        """text with the no-PII sections blanked out, newlines and offsets kept"""
+        spans = self.no_pii_spans()
+        if not spans:
+            return text
+        parts = []
+        last = 0
+        for start, end in spans:
+            parts.append(text[last:start])
+            parts.append(re.sub(r'[^\n]', ' ', text[start:end]))
+            last = end
+        parts.append(text[last:])
+        return ''.join(parts)
+
+
+# Headings of skills sections beyond the indicator words themselves
+SKILL_HEADINGS = frozenset({
+    'skills', 'technical skills', 'kompetenser', 'kompetens', 'färdigheter', 'kunskaper',
+    'tekniska kunskaper', 'språk', 'languages', 'verktyg', 'tools',
+})
+
+
+def _is_skill_heading(heading: str) -> bool:
+    heading = heading.strip('*_: ').lower()
+    # Exact headings only: "Technical experience" or "Kompetensprofil" hold names
+    return heading in SKILL_HEADINGS
+
+
+@lru_cache(maxsize=None)
+def _skill_indicator_patterns() -> List["re.Pattern[str]"]:
+    """One pattern per indicator, so overlapping hits of different indicators all count"""
+    return [re.compile(re.escape(indicator), re.IGNORECASE) for indicator in SectionMap.SKILL_INDICATORS]
+
+
+@lru_cache(maxsize=32)
+def section_map(text: str) -> SectionMap:
+    """Section map of text, shared by the detectors that run on the same text"""
+    return SectionMap(text)
+
+
 class PatternRedactor:
     """Core pattern-based PII detection - simple and reliable"""
     
@@ -87,79 +342,209 @@ class PatternRedactor:
     }
     
     def __init__(self):
-        # Compile patterns for performance
-        self.compiled_patterns = {
-            pii_type: re.compile(pattern, re.IGNORECASE)
-            for pii_type, pattern in self.PATTERNS.items()
-        }
+        # Compile patterns for performance (once per process)
+        self.compiled_patterns = _compile_patterns()
+    
+    # Every pattern needs a digit, an '@' or an http(s):// prefix, so only lines
+    # containing one of those (the "hot" lines) can hold a match
+    HOT_LINE = re.compile(r'^.*?(?:[\d@]|https?://).*$', re.IGNORECASE | re.MULTILINE)
+    # Lines that ADDRESS/PHONE/POSTAL_CODE may span via their [\s-] separators
+    SEPARATOR_LINE = re.compile(r'[\s\-]*')
     
     def detect(self, text: str) -> List[PIIMatch]:
-        """Detect all PII using regex patterns"""
+        """Detect all PII using regex patterns
+        
+        Scans only the hot regions of the text and returns matches ordered by
+        start (ties in PATTERNS order), identical to scanning the whole text.
+        """
         matches = []
         
-        for pii_type, pattern in self.compiled_patterns.items():
-            for match in pattern.finditer(text):
-                matches.append(PIIMatch(
-                    text=match.group(),
-                    start=match.start(),
-                    end=match.end(),
-                    pii_type=pii_type,
-                    confidence=1.0,  # Patterns are high confidence
-                    source='PATTERN'
-                ))
+        for region_start, region_end in self._hot_regions(text):
+            region_matches = []
+            for pii_type, pattern in self.compiled_patterns.items():
+                for match in pattern.finditer(text, region_start, region_end):
+                    region_matches.append(PIIMatch(
+                        text=match.group(),
+                        start=match.start(),
+                        end=match.end(),
+                        pii_type=pii_type,
+                        confidence=1.0,  # Patterns are high confidence
+                        source='PATTERN'
+                    ))
+            # Regions are disjoint and in order, so sorting each one is enough
+            region_matches.sort(key=lambda x: x.start)
+            matches.extend(region_matches)
+        
+        return matches
+    
+    def _hot_regions(self, text: str) -> List[tuple[int, int]]:
+        """Merged (start, end) line ranges that can contain a pattern match
+        
+        A match can only span into the previous line through separator-only
+        lines (e.g. "Storgatan\n12"), so each hot line is extended backwards over
+        those to the first line with other content.
+        """
+        regions = []
+        for hot in self.HOT_LINE.finditer(text):
+            start, end = hot.start(), hot.end()
+            while start > 0:
+                start = text.rfind('\n', 0, start - 1) + 1
+                line_end = text.find('\n', start)
+                if not self.SEPARATOR_LINE.fullmatch(text, start, line_end):
+                    break
+            
+            if regions and start <= regions[-1][1] + 1:
+                regions[-1] = (regions[-1][0], end)
+            else:
+                regions.append((start, end))
+        return regions
+
+
+# Presidio language and the spaCy model its NLP engine loads for it
+PRESIDIO_LANGUAGE = os.getenv("PRESIDIO_LANGUAGE", "sv")
+PRESIDIO_SPACY_MODELS = {"sv": "sv_core_news_sm", "en": "en_core_web_lg"}
+
+@lru_cache(maxsize=None)
+def _load_presidio_analyzer(language: str = PRESIDIO_LANGUAGE):
+    """Build the Presidio AnalyzerEngine once per process and language
+    
+    Recognizers: only spaCy PERSON from the language's model, instead of
+    Presidio's US-centric defaults. PatternRedactor covers the other types.
+    """
+    try:
+        from presidio_analyzer import AnalyzerEngine, RecognizerRegistry
+        from presidio_analyzer.nlp_engine import NlpEngineProvider
+        from presidio_analyzer.predefined_recognizers import SpacyRecognizer
+    except ImportError:
+        print("⚠️  Presidio not installed. Install with: pip install presidio-analyzer")
+        return None
+    
+    model_name = PRESIDIO_SPACY_MODELS.get(language)
+    if model_name is None:
+        print(f"❌ No spaCy model configured for Presidio language '{language}'")
+        return None
+    
+    try:
+        nlp_engine = NlpEngineProvider(nlp_configuration={
+            "nlp_engine_name": "spacy",
+            "models": [{"lang_code": language, "model_name": model_name}],
+            "ner_model_configuration": {
+                # Swedish models label people PRS, English ones PERSON
+                "model_to_presidio_entity_mapping": {"PRS": "PERSON", "PER": "PERSON", "PERSON": "PERSON"},
+                "labels_to_ignore": ["EVN", "LOC", "GPE", "MSR", "OBJ", "ORG", "TME", "WRK"],
+            },
+        }).create_engine()
         
-        return sorted(matches, key=lambda x: x.start)
+        registry = RecognizerRegistry(supported_languages=[language])
+        registry.add_recognizer(SpacyRecognizer(supported_language=language, supported_entities=["PERSON"]))
+        
+        analyzer = AnalyzerEngine(registry=registry, nlp_engine=nlp_engine, supported_languages=[language])
+        print(f"✅ Presidio initialized for '{language}' with {model_name}")
+        return analyzer
+    except Exception as e:
+        print(f"❌ Failed to initialize Presidio: {e}")
+    return None
+
+
+# nlp.pipe settings for batched NER (n_process > 1 forks workers per call, use it for bulk jobs)
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "16"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+
+@lru_cache(maxsize=None)
+def _load_spacy_model(model_name: str = "sv_core_news_sm"):
+    """Load a spaCy model once per process, trimmed to NER, None if unavailable"""
+    try:
+        import spacy
+    except ImportError:
+        print("⚠️  spaCy not installed. Install with: pip install spacy")
+        return None
+    try:
+        # Only NER is used: don't load tagger, parser, lemmatizer etc. at all
+        meta = spacy.util.get_model_meta(spacy.util.get_package_path(model_name))
+        components = meta.get("components") or meta.get("pipeline", [])
+        nlp = spacy.load(model_name, exclude=[name for name in components if name not in ("ner", "tok2vec")])
+    except (ImportError, OSError):
+        print(f"⚠️  Swedish spaCy model not found. Install with: python -m spacy download {model_name}")
+        return None
+    
+    # Keep the shared tok2vec only if NER listens to it
+    keep = {"ner"}
+    if "tok2vec" in nlp.pipe_names and "ner" in getattr(nlp.get_pipe("tok2vec"), "listening_components", []):
+        keep.add("tok2vec")
+    for name in list(nlp.pipe_names):
+        if name not in keep:
+            nlp.remove_pipe(name)
+    return nlp
+
+
+@lru_cache(maxsize=None)
+def _compile_patterns() -> Dict[PIIType, "re.Pattern[str]"]:
+    """Compile PatternRedactor.PATTERNS once, shared by every instance"""
+    return {
+        pii_type: re.compile(pattern, re.IGNORECASE)
+        for pii_type, pattern in PatternRedactor.PATTERNS.items()
+    }
 
 
 class PresidioRedactor:
-    """Optional Presidio integration for enhanced detection"""
+    """Optional Presidio integration for enhanced detection
     
-    def __init__(self, language: str = "en"):  # English by default (No Swedish support)
-        try:
-            from presidio_analyzer import AnalyzerEngine
-            
-            # Initialize Presidio
-            self.analyzer = AnalyzerEngine()
-            self.language = "en"
-            
-            # Test if English works
-            try:
-                test_results = self.analyzer.analyze(
-                    text="Test email test@example.com",
-                    language="en",
-                    score_threshold=0.1
-                )
-                print(f"✅ Presidio initialized with English language support")
-            except Exception as e:
-                print(f"⚠️  Presidio initialization warning: {e}")
-                # Still continue, it might work with actual text
-            
-            self.available = True
-            
-        except ImportError:
-            self.available = False
-            print("⚠️  Presidio not installed. Install with: pip install presidio-analyzer")
-        except Exception as e:
-            print(f"❌ Failed to initialize Presidio: {e}")
-            self.available = False
+    Uses the shared per-language analyzer from _load_presidio_analyzer.
+    """
     
-    def detect(self, text: str, confidence_threshold: float = 0.6) -> List[PIIMatch]:
-        """Detect PII using Presidio (English only)"""
+    # Presidio entities PatternRedactor doesn't already find
+    GAP_ENTITIES = ['PERSON']
+    
+    def __init__(self, language: str = PRESIDIO_LANGUAGE):
+        self.language = language
+        self.analyzer = _load_presidio_analyzer(language)
+        self.available = self.analyzer is not None
+    
+    def detect(self, text: str, confidence_threshold: float = 0.6,
+               entities: Optional[List[str]] = None) -> List[PIIMatch]:
+        """Detect PII using Presidio (entities=None runs every recognizer)"""
         if not self.available:
             return []
         
         try:
-            # Always use English
+            # Skills sections can't hold PII; blanking them keeps offsets valid
             results = self.analyzer.analyze(
-                text=text,
-                language="en",
+                text=section_map(text).mask_no_pii(text),
+                language=self.language,
+                entities=entities,
                 score_threshold=confidence_threshold
             )
-            
         except Exception as e:
             print(f"❌ Presidio detection failed: {e}")
             return []
         
+        return self._to_matches(text, results)
+    
+    def detect_batch(self, texts: List[str], confidence_threshold: float = 0.6,
+                     entities: Optional[List[str]] = None) -> List[List[PIIMatch]]:
+        """detect for many texts, with the NLP engine run through nlp.pipe by Presidio's batch analyzer"""
+        if not self.available:
+            return [[] for _ in texts]
+        
+        from presidio_analyzer import BatchAnalyzerEngine
+        
+        try:
+            results = BatchAnalyzerEngine(analyzer_engine=self.analyzer).analyze_iterator(
+                [section_map(text).mask_no_pii(text) for text in texts],
+                language=self.language,
+                batch_size=SPACY_BATCH_SIZE,
+                n_process=SPACY_N_PROCESS,
+                entities=entities,
+                score_threshold=confidence_threshold
+            )
+        except Exception as e:
+            print(f"❌ Presidio batch detection failed: {e}")
+            return [[] for _ in texts]
+        
+        return [self._to_matches(text, text_results) for text, text_results in zip(texts, results)]
+    
+    def _to_matches(self, text: str, results) -> List[PIIMatch]:
         matches = []
         for result in results:
             # Map Presidio types to our types
@@ -173,7 +558,6 @@ class PresidioRedactor:
                     confidence=float(result.score),
                     source='PRESIDIO'
                 ))
-        
         return matches
     
     def _map_presidio_type(self, presidio_type: str) -> Optional[PIIType]:
@@ -184,7 +568,6 @@ class PresidioRedactor:
             'PHONE_NUMBER': PIIType.PHONE,
             'DATE_TIME': PIIType.DATE,
             'URL': PIIType.URL,
-            'US_SSN': PIIType.SSN_SWEDISH,  # Generic SSN handling
         }
         return mapping.get(presidio_type)
 
@@ -192,89 +575,106 @@ class PresidioRedactor:
 class NameDetector:
     """Smart name detection for Swedish CVs"""
     
+    # Common Swedish/Scandinavian name patterns for validation
+    COMMON_TITLES = frozenset({
+        'mr', 'mrs', 'ms', 'dr', 'prof', 'ing', 'civ.ing', 
+        'herr', 'fru', 'fröken'
+    })
+    
+    # EXPANDED: Words that are NOT names (common false positives)
+    STOPWORDS = frozenset({
+        # Swedish common words
+        'och', 'att', 'det', 'som', 'är', 'för', 'med', 'på', 'av', 'till',
+        'den', 'har', 'ett', 'inte', 'var', 'jag', 'en', 'han', 'ska', 'hon',
+        'vi', 'de', 'detta', 'alla', 'vara', 'kan', 'från', 'vid', 'under',
+        'hemsida', 'kompisar', 'tekniska'
+        # English common words
+        'and', 'the', 'for', 'with', 'from', 'have', 'this', 'that',
+        # Tech/Dev tools - COMPREHENSIVE LIST
+        'docker', 'kubernetes', 'linux', 'python', 'java', 'javascript', 
+        'typescript', 'react', 'angular', 'vue', 'node', 'nodejs',
+        'github', 'gitlab', 'bitbucket', 'azure', 'aws', 'gcp',
+        'visual', 'studio', 'code', 'vscode', 'intellij', 'eclipse',
+        'mysql', 'postgresql', 'mongodb', 'redis', 'kafka',
+        'jenkins', 'terraform', 'ansible', 'git', 'svn',
+        'windows', 'macos', 'ubuntu', 'debian', 'centos',
+        'html', 'css', 'sql', 'bash', 'powershell',
+        'slack', 'jira', 'confluence', 'trello', 'asana',
+        'figma', 'sketch', 'adobe', 'photoshop', 'illustrator',
+        'excel', 'word', 'powerpoint', 'outlook', 'teams',
+        'chrome', 'firefox', 'safari', 'edge', 'opera',
+        'android', 'ios', 'swift', 'kotlin', 'flutter',
+        'webpack', 'babel', 'npm', 'yarn', 'pip',
+        'spring', 'django', 'flask', 'express', 'fastapi',
+        'junit', 'pytest', 'jest', 'mocha', 'selenium',
+        'wireshark', 'nmap', 'metasploit', 'burp', 'kali',
+        'postman', 'insomnia', 'swagger', 'grafana', 'prometheus',
+        'splunk', 'elk', 'kibana', 'logstash', 'datadog', 'digiflisp'
+        # Programming concepts
+        'api', 'rest', 'graphql', 'grpc', 'soap', 'json', 'xml',
+        'http', 'https', 'tcp', 'udp', 'ssh', 'ftp', 'smtp',
+        'oauth', 'jwt', 'saml', 'ldap', 'active', 'directory',
+        'microservices', 'serverless', 'devops', 'cicd', 'agile', 'scrum',
+        # CV/Job terms
+        'team', 'gruppchef', 'ledamot', 'student', 'intern', 'manager',
+        'engineer', 'developer', 'analyst', 'consultant', 'architect',
+        'senior', 'junior', 'lead', 'principal', 'staff',
+        'fullstack', 'frontend', 'backend', 'devops', 'sre',
+        # Companies (common ones)
+        'google', 'microsoft', 'amazon', 'apple', 'meta', 'facebook',
+        'ibm', 'oracle', 'salesforce', 'sap', 'cisco', 'intel',
+        'volvo', 'scania', 'ericsson', 'spotify', 'klarna',
+        # Universities
+        'chalmers', 'kth', 'lund', 'uppsala', 'linköping', 'stockholm',
+        'göteborgs', 'umeå', 'örebro', 'karlstad', 'växjö',
+        'university', 'universitet', 'högskola', 'college',
+        # Months
+        'januari', 'februari', 'mars', 'april', 'maj', 'juni',
+        'juli', 'augusti', 'september', 'oktober', 'november', 'december',
+        'january', 'february', 'march', 'april', 'may', 'june',
+        'july', 'august', 'september', 'october', 'november', 'december',
+        # Cities (Swedish)
+        'göteborg', 'stockholm', 'malmö', 'uppsala', 'västerås', 'örebro',
+        'linköping', 'helsingborg', 'jönköping', 'norrköping', 'lund',
+        'umeå', 'gävle', 'borås', 'eskilstuna', 'karlstad', 'växjö',
+        'halmstad', 'sundsvall', 'luleå', 'trollhättan', 'kalmar',
+    })
+    
+    # Pattern: "Referens:" or "Referens :" followed by a name
+    # Also matches: "**Referens:**", "Reference:", etc.
+    REFERENCE_PATTERNS = [
+        re.compile(r'(?:Referens|Reference)\s*:\s*\*?\*?([A-ZÅÄÖ][a-zåäö]+(?:\s+[A-ZÅÄÖ][a-zåäö]+)+)'),
+        re.compile(r'(?:Referens|Reference)\s*:\s*\*?\*?([A-ZÅÄÖ][a-zåäö]+(?:\s+[A-ZÅÄÖ][a-zåäö]+)+)(?:\s*\([^)]+\))?'),
+        re.compile(r'\*\*([A-ZÅÄÖ][a-zåäö]+(?:\s+[A-ZÅÄÖ][a-zåäö]+)+)\*\*\s*\n\s*(?:TA Group Manager|System Engineer|Gruppchef|[A-Z])'),
+    ]
+    
+    NON_NAME_CHARS = re.compile(r'[0-9@#$%^&*()+=\[\]{};:"|<>?/\\]')
+    
+    # Common patterns for tech terms, all alternatives in one scan
+    TECH_TERM = re.compile(
+        r'.*(?:'
+        r'[sS]tudio|'  # Visual Studio, Android Studio
+        r'[Cc]ode|'    # VS Code, etc.
+        r'[Ss]ystem|'  # System Engineer (title, not name)
+        r'[Gg]roup|'   # Volvo Group
+        r'[Tt]ech|'    # Tech related
+        r'\d'          # Contains numbers
+        r')'
+    )
+    
     def __init__(self, applicant_name: Optional[str] = None, use_spacy: bool = False):
         self.applicant_name = applicant_name
         self.applicant_parts = self._parse_name(applicant_name) if applicant_name else []
         self.use_spacy = use_spacy
         self.nlp = None
         
-        # Load spaCy model if requested
+        # Load spaCy model if requested (shared across detectors)
         if use_spacy:
-            try:
-                import spacy
-                try:
-                    self.nlp = spacy.load("sv_core_news_sm")
-                except OSError:
-                    print("⚠️  Swedish spaCy model not found. Install with: python -m spacy download sv_core_news_sm")
-                    self.use_spacy = False
-            except ImportError:
-                print("⚠️  spaCy not installed. Install with: pip install spacy")
-                self.use_spacy = False
-        
-        # Common Swedish/Scandinavian name patterns for validation
-        self.common_titles = {
-            'mr', 'mrs', 'ms', 'dr', 'prof', 'ing', 'civ.ing', 
-            'herr', 'fru', 'fröken'
-        }
+            self.nlp = _load_spacy_model("sv_core_news_sm")
+            self.use_spacy = self.nlp is not None
         
-        # EXPANDED: Words that are NOT names (common false positives)
-        self.stopwords = {
-            # Swedish common words
-            'och', 'att', 'det', 'som', 'är', 'för', 'med', 'på', 'av', 'till',
-            'den', 'har', 'ett', 'inte', 'var', 'jag', 'en', 'han', 'ska', 'hon',
-            'vi', 'de', 'detta', 'alla', 'vara', 'kan', 'från', 'vid', 'under',
-            'hemsida', 'kompisar', 'tekniska'
-            # English common words
-            'and', 'the', 'for', 'with', 'from', 'have', 'this', 'that',
-            # Tech/Dev tools - COMPREHENSIVE LIST
-            'docker', 'kubernetes', 'linux', 'python', 'java', 'javascript', 
-            'typescript', 'react', 'angular', 'vue', 'node', 'nodejs',
-            'github', 'gitlab', 'bitbucket', 'azure', 'aws', 'gcp',
-            'visual', 'studio', 'code', 'vscode', 'intellij', 'eclipse',
-            'mysql', 'postgresql', 'mongodb', 'redis', 'kafka',
-            'jenkins', 'terraform', 'ansible', 'git', 'svn',
-            'windows', 'macos', 'ubuntu', 'debian', 'centos',
-            'html', 'css', 'sql', 'bash', 'powershell',
-            'slack', 'jira', 'confluence', 'trello', 'asana',
-            'figma', 'sketch', 'adobe', 'photoshop', 'illustrator',
-            'excel', 'word', 'powerpoint', 'outlook', 'teams',
-            'chrome', 'firefox', 'safari', 'edge', 'opera',
-            'android', 'ios', 'swift', 'kotlin', 'flutter',
-            'webpack', 'babel', 'npm', 'yarn', 'pip',
-            'spring', 'django', 'flask', 'express', 'fastapi',
-            'junit', 'pytest', 'jest', 'mocha', 'selenium',
-            'wireshark', 'nmap', 'metasploit', 'burp', 'kali',
-            'postman', 'insomnia', 'swagger', 'grafana', 'prometheus',
-            'splunk', 'elk', 'kibana', 'logstash', 'datadog', 'digiflisp'
-            # Programming concepts
-            'api', 'rest', 'graphql', 'grpc', 'soap', 'json', 'xml',
-            'http', 'https', 'tcp', 'udp', 'ssh', 'ftp', 'smtp',
-            'oauth', 'jwt', 'saml', 'ldap', 'active', 'directory',
-            'microservices', 'serverless', 'devops', 'cicd', 'agile', 'scrum',
-            # CV/Job terms
-            'team', 'gruppchef', 'ledamot', 'student', 'intern', 'manager',
-            'engineer', 'developer', 'analyst', 'consultant', 'architect',
-            'senior', 'junior', 'lead', 'principal', 'staff',
-            'fullstack', 'frontend', 'backend', 'devops', 'sre',
-            # Companies (common ones)
-            'google', 'microsoft', 'amazon', 'apple', 'meta', 'facebook',
-            'ibm', 'oracle', 'salesforce', 'sap', 'cisco', 'intel',
-            'volvo', 'scania', 'ericsson', 'spotify', 'klarna',
-            # Universities
-            'chalmers', 'kth', 'lund', 'uppsala', 'linköping', 'stockholm',
-            'göteborgs', 'umeå', 'örebro', 'karlstad', 'växjö',
-            'university', 'universitet', 'högskola', 'college',
-            # Months
-            'januari', 'februari', 'mars', 'april', 'maj', 'juni',
-            'juli', 'augusti', 'september', 'oktober', 'november', 'december',
-            'january', 'february', 'march', 'april', 'may', 'june',
-            'july', 'august', 'september', 'october', 'november', 'december',
-            # Cities (Swedish)
-            'göteborg', 'stockholm', 'malmö', 'uppsala', 'västerås', 'örebro',
-            'linköping', 'helsingborg', 'jönköping', 'norrköping', 'lund',
-            'umeå', 'gävle', 'borås', 'eskilstuna', 'karlstad', 'växjö',
-            'halmstad', 'sundsvall', 'luleå', 'trollhättan', 'kalmar',
-        }
+        self.common_titles = self.COMMON_TITLES
+        self.stopwords = self.STOPWORDS
     
     def _parse_name(self, name: str) -> List[str]:
         """Parse name into parts for matching"""
@@ -284,68 +684,61 @@ class NameDetector:
         parts = [p.strip() for p in name.split()]
         return [p for p in parts if len(p) > 1]
     
-    def detect(self, text: str) -> List[PIIMatch]:
-        """Detect names in CV text"""
+    def detect(self, text: str, applicant_name: Optional[str] = None, spacy_doc=None) -> List[PIIMatch]:
+        """Detect names in CV text
+        
+        applicant_name overrides the name given to the constructor, so a single
+        shared detector can serve every request. spacy_doc is this text already
+        parsed by parse_many(); without it spaCy runs on the text here.
+        """
+        if applicant_name is None:
+            applicant_name = self.applicant_name
+        # A blank name (no first/last name given) would match every space
+        applicant_name = applicant_name.strip() if applicant_name else None
         matches = []
         lines = text.split('\n')
         
         # 1. Detect applicant name (if provided and appears in text)
-        if self.applicant_name:
-            matches.extend(self._find_applicant_name(text))
+        if applicant_name:
+            matches.extend(self._find_applicant_name(text, applicant_name))
         
         # 2. Detect names from first few lines (CV header)
-        matches.extend(self._detect_header_name(lines, text))
+        matches.extend(self._detect_header_name(lines, text, applicant_name))
         
         # 3. Detect reference names (Referens: Name pattern)
         matches.extend(self._detect_reference_names(text))
         
         # 4. Use spaCy NLP if enabled (with aggressive filtering)
         if self.use_spacy and self.nlp:
-            matches.extend(self._detect_spacy_names(text))
+            if spacy_doc is None:
+                with span("detect_spacy"):
+                    spacy_doc = self.nlp(section_map(text).mask_no_pii(text))
+            matches.extend(self._detect_spacy_names(text, spacy_doc))
         
         # Remove duplicates/overlaps
         return self._deduplicate_matches(matches)
     
-    def _find_applicant_name(self, text: str) -> List[PIIMatch]:
-        """Find exact matches of the applicant name"""
+    def _find_applicant_name(self, text: str, applicant_name: str) -> List[PIIMatch]:
+        """Find the applicant name and its parts (case- and diacritic-insensitive)"""
         matches = []
         
-        # Try exact match first
-        for match in re.finditer(re.escape(self.applicant_name), text, re.IGNORECASE):
+        # Full name and every part in one pass over the folded text
+        for match in _applicant_name_pattern(applicant_name).finditer(fold_diacritics(text)):
+            start, end = match.span()
+            is_full = match.lastgroup == 'full'
             matches.append(PIIMatch(
-                text=match.group(),
-                start=match.start(),
-                end=match.end(),
+                text=text[start:end],
+                start=start,
+                end=end,
                 pii_type=PIIType.APPLICANT_NAME,
-                confidence=1.0,
-                source='NAME_APPLICANT'
+                confidence=1.0 if is_full else 0.9,
+                source='NAME_APPLICANT' if is_full else 'NAME_APPLICANT_PART'
             ))
         
-        # Also try matching individual parts (first name, last name separately)
-        for part in self.applicant_parts:
-            if len(part) < 3:  # Skip initials
-                continue
-            
-            # Word boundary match to avoid partial matches
-            pattern = r'\b' + re.escape(part) + r'\b'
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                # Check if already covered by full name match
-                overlaps = any(m.start <= match.start() < m.end or 
-                             m.start < match.end() <= m.end 
-                             for m in matches)
-                if not overlaps:
-                    matches.append(PIIMatch(
-                        text=match.group(),
-                        start=match.start(),
-                        end=match.end(),
-                        pii_type=PIIType.APPLICANT_NAME,
-                        confidence=0.9,
-                        source='NAME_APPLICANT_PART'
-                    ))
-        
         return matches
     
-    def _detect_header_name(self, lines: List[str], full_text: str) -> List[PIIMatch]:
+    def _detect_header_name(self, lines: List[str], full_text: str,
+                            applicant_name: Optional[str] = None) -> List[PIIMatch]:
         """Detect name from CV header (first few lines)"""
         matches = []
         
@@ -361,7 +754,7 @@ class NameDetector:
                     continue
             
             # If we already have applicant name and this matches, skip
-            if self.applicant_name and self.applicant_name.lower() in line.lower():
+            if applicant_name and fold_diacritics(applicant_name).casefold() in fold_diacritics(line).casefold():
                 checked_lines += 1
                 continue
             
@@ -389,16 +782,8 @@ class NameDetector:
         """Detect names in reference sections"""
         matches = []
         
-        # Pattern: "Referens:" or "Referens :" followed by a name
-        # Also matches: "**Referens:**", "Reference:", etc.
-        patterns = [
-            r'(?:Referens|Reference)\s*:\s*\*?\*?([A-ZÅÄÖ][a-zåäö]+(?:\s+[A-ZÅÄÖ][a-zåäö]+)+)',
-            r'(?:Referens|Reference)\s*:\s*\*?\*?([A-ZÅÄÖ][a-zåäö]+(?:\s+[A-ZÅÄÖ][a-zåäö]+)+)(?:\s*\([^)]+\))?',
-            r'\*\*([A-ZÅÄÖ][a-zåäö]+(?:\s+[A-ZÅÄÖ][a-zåäö]+)+)\*\*\s*\n\s*(?:TA Group Manager|System Engineer|Gruppchef|[A-Z])',
-        ]
-        
-        for pattern in patterns:
-            for match in re.finditer(pattern, text):
+        for pattern in self.REFERENCE_PATTERNS:
+            for match in pattern.finditer(text):
                 name = match.group(1).strip()
                 
                 # Validate it's actually a name
@@ -427,7 +812,7 @@ class NameDetector:
             return False
         
         # Should not contain numbers or special chars
-        if re.search(r'[0-9@#$%^&*()+=\[\]{};:"|<>?/\\]', text):
+        if self.NON_NAME_CHARS.search(text):
             return False
         
         # Split into words
@@ -442,7 +827,7 @@ class NameDetector:
             return False
         
         # Check against stopwords (case-insensitive)
-        if any(w.lower() in self.stopwords for w in words):
+        if not self.stopwords.isdisjoint(text.lower().split()):
             return False
         
         # Each word should be reasonable length
@@ -451,11 +836,19 @@ class NameDetector:
         
         return True
     
-    def _detect_spacy_names(self, text: str) -> List[PIIMatch]:
-        """Detect names using spaCy NER with aggressive filtering"""
+    def parse_many(self, texts: List[str]) -> list:
+        """Run spaCy NER over many texts in one nlp.pipe call (None per text without spaCy)"""
+        if not (self.use_spacy and self.nlp):
+            return [None] * len(texts)
+        with span("detect_spacy"):
+            # Skills sections are blanked out so NER skips them, offsets stay valid
+            masked = [section_map(text).mask_no_pii(text) for text in texts]
+            return list(self.nlp.pipe(masked, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS))
+    
+    def _detect_spacy_names(self, text: str, doc) -> List[PIIMatch]:
+        """Detect names in a spaCy-parsed text with aggressive filtering"""
         matches = []
-        
-        doc = self.nlp(text)
+        sections = section_map(text)
         
         for ent in doc.ents:
             # Only look at PERSON entities (Swedish models use PER or PRS)
@@ -473,7 +866,7 @@ class NameDetector:
                 continue
             
             # Check context - avoid names in skill lists
-            if self._in_skill_section(text, ent.start_char):
+            if sections.in_skill_section(ent.start_char):
                 continue
             
             matches.append(PIIMatch(
@@ -489,77 +882,26 @@ class NameDetector:
     
     def _is_likely_tech_term(self, text: str) -> bool:
         """Check if text is likely a technology/tool name"""
-        lower = text.lower()
-        words = lower.split()
-        
         # Check if any word is a known tech term
-        if any(word in self.stopwords for word in words):
+        if not self.stopwords.isdisjoint(text.lower().split()):
             return True
         
         # Common patterns for tech terms
-        tech_patterns = [
-            r'.*[sS]tudio.*',  # Visual Studio, Android Studio
-            r'.*[Cc]ode.*',    # VS Code, etc.
-            r'.*[Ss]ystem.*',  # System Engineer (title, not name)
-            r'.*[Gg]roup.*',   # Volvo Group
-            r'.*[Tt]ech.*',    # Tech related
-            r'.*\d+.*',        # Contains numbers
-        ]
-        
-        for pattern in tech_patterns:
-            if re.match(pattern, text):
-                return True
-        
-        return False
+        return self.TECH_TERM.match(text) is not None
     
     def _in_skill_section(self, text: str, position: int) -> bool:
         """Check if position is within a skills/tech section"""
-        # Get surrounding context (500 chars before)
-        context_start = max(0, position - 500)
-        context = text[context_start:position].lower()
-        
-        # Skills section indicators
-        skill_indicators = [
-            'färdigheter', 'skills', 'teknisk', 'technical',
-            'utvecklingsspråk', 'programming', 'languages',
-            'utvecklingsmiljöer', 'tools', 'technologies',
-            'kompetens', 'competence', 'erfarenhet av'
-        ]
-        
-        # If we find skill indicators nearby, this is probably not a name
-        for indicator in skill_indicators:
-            if indicator in context:
-                return True
-        
-        return False
+        return section_map(text).in_skill_section(position)
     
     def _deduplicate_matches(self, matches: List[PIIMatch]) -> List[PIIMatch]:
         """Remove duplicate and overlapping matches, keep highest confidence"""
-        if not matches:
-            return []
-        
-        # Sort by start position, then by confidence (descending)
-        sorted_matches = sorted(matches, key=lambda x: (x.start, -x.confidence))
-        
-        result = []
-        for match in sorted_matches:
-            # Check if this match overlaps with any already added
-            overlaps = False
-            for existing in result:
-                if (match.start < existing.end and match.end > existing.start):
-                    overlaps = True
-                    break
-            
-            if not overlaps:
-                result.append(match)
-        
-        return result
+        return resolve_overlaps(matches)
 
 
 class PIIRedactor:
     """Main redaction pipeline - simple and focused"""
     
-    def __init__(self, use_presidio: bool = False, language: str = "en",
+    def __init__(self, use_presidio: bool = False, language: str = PRESIDIO_LANGUAGE,
                  applicant_name: Optional[str] = None, use_spacy_names: bool = False):
         self.pattern_redactor = PatternRedactor()
         self.name_detector = NameDetector(applicant_name=applicant_name, use_spacy=use_spacy_names)
@@ -567,55 +909,101 @@ class PIIRedactor:
         self.use_presidio = use_presidio and (self.presidio_redactor and self.presidio_redactor.available)
         self.applicant_name = applicant_name
     
-    def detect_pii(self, text: str) -> List[PIIMatch]:
-        """Detect all PII in text"""
+    def detect_pii(self, text: str, applicant_name: Optional[str] = None, spacy_doc=None,
+                   presidio_matches: Optional[List[PIIMatch]] = None) -> List[PIIMatch]:
+        """Detect all PII in text
+        
+        applicant_name is per call so one redactor can be shared across requests;
+        falls back to the name given to the constructor. spacy_doc and
+        presidio_matches are precomputed results from detect_pii_batch.
+        """
+        if applicant_name is None:
+            applicant_name = self.applicant_name
         all_matches = []
         
         # Step 1: Pattern matching (emails, phones, addresses - always reliable)
-        pattern_matches = self.pattern_redactor.detect(text)
+        with span("detect_patterns"):
+            pattern_matches = self.pattern_redactor.detect(text)
         all_matches.extend(pattern_matches)
         
         # Step 2: Name detection (smart, conservative)
-        name_matches = self.name_detector.detect(text)
+        with span("detect_names"):
+            name_matches = self.name_detector.detect(text, applicant_name, spacy_doc)
         all_matches.extend(name_matches)
         
-        # Step 3: Presidio (optional, fills gaps)
+        # Step 3: Presidio (optional, fills gaps the patterns above don't cover)
         if self.use_presidio:
-            presidio_matches = self.presidio_redactor.detect(text)
-            
-            # Only add Presidio matches that don't overlap with pattern/name matches
-            for presidio_match in presidio_matches:
-                if not any(presidio_match.overlaps_with(m) for m in all_matches):
-                    all_matches.append(presidio_match)
+            if presidio_matches is None:
+                with span("detect_presidio"):
+                    presidio_matches = self.presidio_redactor.detect(
+                        text, entities=PresidioRedactor.GAP_ENTITIES)
+            all_matches.extend(presidio_matches)
         
-        # Step 4: Remove overlapping matches (keep first/higher confidence)
-        return self._remove_overlaps(sorted(all_matches, key=lambda x: x.start))
+        # Step 4: Remove overlapping matches (higher confidence, then source priority)
+        return resolve_overlaps(all_matches)
+    
+    def detect_pii_batch(self, texts: List[str],
+                         applicant_names: Optional[List[Optional[str]]] = None) -> List[List[PIIMatch]]:
+        """detect_pii for many texts, with spaCy NER and Presidio each run as one batch"""
+        if applicant_names is None:
+            applicant_names = [None] * len(texts)
+        docs = self.name_detector.parse_many(texts)
+        if self.use_presidio:
+            with span("detect_presidio"):
+                presidio_batch = self.presidio_redactor.detect_batch(
+                    texts, entities=PresidioRedactor.GAP_ENTITIES)
+        else:
+            presidio_batch = [None] * len(texts)
+        return [
+            self.detect_pii(text, applicant_name, doc, presidio_matches)
+            for text, applicant_name, doc, presidio_matches in zip(texts, applicant_names, docs, presidio_batch)
+        ]
     
     def _remove_overlaps(self, matches: List[PIIMatch]) -> List[PIIMatch]:
-        """Remove overlapping matches, keeping the first one"""
-        if not matches:
-            return []
-        
-        result = [matches[0]]
-        for match in matches[1:]:
-            # Check if this match overlaps with the last one we kept
-            if not match.overlaps_with(result[-1]):
-                result.append(match)
-        
-        return result
+        """Remove overlapping matches, see resolve_overlaps for the priority rule"""
+        return resolve_overlaps(matches)
     
-    def redact(self, text: str, matches: List[PIIMatch] = None) -> str:
+    def redact(self, text: str, matches: List[PIIMatch] = None,
+               applicant_name: Optional[str] = None) -> str:
         """Redact PII from text"""
+        redacted, _ = self.redact_with_offsets(text, matches, applicant_name)
+        return redacted
+    
+    def redact_with_offsets(self, text: str, matches: List[PIIMatch] = None,
+                            applicant_name: Optional[str] = None) -> tuple[str, List[RedactedSpan]]:
+        """
+        Redact PII from text in a single forward pass.
+        
+        Returns the redacted text and one RedactedSpan per label, ordered by
+        position, mapping each label back to the original text. A match that
+        overlaps an earlier one is skipped.
+        """
         if matches is None:
-            matches = self.detect_pii(text)
+            matches = self.detect_pii(text, applicant_name)
         
-        # Apply redactions in reverse order to preserve positions
-        redacted = text
-        for match in sorted(matches, key=lambda x: x.start, reverse=True):
+        chunks = []
+        spans = []
+        cursor = 0  # Position in the original text
+        length = 0  # Length of the redacted text built so far
+        for match in sorted(matches, key=lambda x: x.start):
+            if match.start < cursor:
+                continue
             label = PatternRedactor.REDACTION_LABELS.get(match.pii_type, '[REDACTED]')
-            redacted = redacted[:match.start] + label + redacted[match.end:]
+            chunks.append(text[cursor:match.start])
+            length += match.start - cursor
+            chunks.append(label)
+            spans.append(RedactedSpan(
+                redacted_start=length,
+                redacted_end=length + len(label),
+                original_start=match.start,
+                original_end=match.end,
+                pii_type=match.pii_type
+            ))
+            length += len(label)
+            cursor = match.end
+        chunks.append(text[cursor:])
         
-        return redacted
+        return ''.join(chunks), spans
     
     def get_statistics(self, matches: List[PIIMatch]) -> Dict:
         """Get statistics about detected PII"""
@@ -642,18 +1030,43 @@ def redact_text(text: str, use_presidio: bool = False, applicant_name: Optional[
     
     Args:
         text: Text to redact
-        use_presidio: Enable Presidio detection (optional) - uses English
+        use_presidio: Enable Presidio detection (optional) - Swedish by default
         applicant_name: Name of the CV applicant (will be redacted if found)
         use_spacy_names: Enable spaCy NER for additional name detection
     
     Returns:
         (redacted_text, list_of_matches)
     """
-    redactor = PIIRedactor(
-        use_presidio=use_presidio, 
-        applicant_name=applicant_name, 
-        use_spacy_names=use_spacy_names
-    )
-    matches = redactor.detect_pii(text)
-    redacted = redactor.redact(text, matches)
+    redactor = get_redactor(use_presidio=use_presidio, use_spacy_names=use_spacy_names)
+    matches = redactor.detect_pii(text, applicant_name)
+    with span("redact"):
+        redacted = redactor.redact(text, matches)
     return redacted, matches
+
+
+def redact_texts(texts: List[str], applicant_names: Optional[List[Optional[str]]] = None,
+                 use_presidio: bool = False, use_spacy_names: bool = False) -> List[tuple[str, List[PIIMatch]]]:
+    """
+    Batch API: redact_text for many texts, sharing one spaCy nlp.pipe call
+    
+    Returns:
+        [(redacted_text, list_of_matches), ...] in input order
+    """
+    redactor = get_redactor(use_presidio=use_presidio, use_spacy_names=use_spacy_names)
+    results = []
+    for text, matches in zip(texts, redactor.detect_pii_batch(texts, applicant_names)):
+        with span("redact"):
+            results.append((redactor.redact(text, matches), matches))
+    return results
+
+
+@lru_cache(maxsize=None)
+def get_redactor(use_presidio: bool = False, use_spacy_names: bool = False) -> PIIRedactor:
+    """
+    Shared, long-lived redactor for a given engine configuration.
+    
+    Compiled patterns, the spaCy model and the Presidio analyzer are built on
+    first use and reused by every later call. The applicant name is not part of
+    the redactor; pass it to detect_pii()/redact() per request.
+    """
+    return PIIRedactor(use_presidio=use_presidio, use_spacy_names=use_spacy_names)
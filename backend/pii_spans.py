@@ -0,0 +1,82 @@
+"""Compact storage of detected PII spans, and rendering any reveal policy from them.
+
+Detection (patterns, NER, LLM formatting) runs once per CV. Its resolved
+matches are stored next to the unredacted Markdown, so a partially or fully
+revealed version can later be rendered in one pass without re-detection.
+"""
+
+from __future__ import annotations
+import base64
+import struct
+from typing import Collection, Iterable
+from pii_redactor import PIIMatch, PIIType, get_redactor
+
+SPAN_FORMAT_VERSION = 1
+
+# Persisted codes: only ever append to these, never reorder
+SPAN_TYPES: tuple[PIIType, ...] = (
+    PIIType.EMAIL, PIIType.PHONE, PIIType.SSN_SWEDISH, PIIType.ADDRESS, PIIType.POSTAL_CODE,
+    PIIType.URL, PIIType.PERSON, PIIType.DATE, PIIType.APPLICANT_NAME,
+)
+SPAN_SOURCES: tuple[str, ...] = (
+    'PATTERN', 'NAME_APPLICANT', 'NAME_APPLICANT_PART', 'NAME_REFERENCE', 'NAME_HEADER',
+    'NAME_SPACY', 'PRESIDIO',
+)
+_TYPE_CODES = {pii_type: code for code, pii_type in enumerate(SPAN_TYPES)}
+_SOURCE_CODES = {source: code for code, source in enumerate(SPAN_SOURCES)}
+
+# start, end, type code, source code, confidence in percent: 11 bytes per span
+_RECORD = struct.Struct("<IIBBB")
+
+
+def encode_spans(matches: Iterable[PIIMatch]) -> str:
+    """Pack matches into a base64 string (version byte + fixed-size records, by start)."""
+    records = bytearray([SPAN_FORMAT_VERSION])
+    for match in sorted(matches, key=lambda m: m.start):
+        records += _RECORD.pack(
+            match.start,
+            match.end,
+            _TYPE_CODES[match.pii_type],
+            _SOURCE_CODES[match.source],
+            round(match.confidence * 100),
+        )
+    return base64.b64encode(bytes(records)).decode("ascii")
+
+
+def decode_spans(encoded: str, text: str) -> list[PIIMatch]:
+    """Matches stored by encode_spans, with their text taken from the unredacted text.
+
+    Raises ValueError for malformed data, including spans that overlap or fall outside text.
+    """
+    data = base64.b64decode(encoded, validate=True)
+    if not data or data[0] != SPAN_FORMAT_VERSION:
+        raise ValueError(f"Unsupported span format version: {data[0] if data else None}")
+    if (len(data) - 1) % _RECORD.size:
+        raise ValueError("Truncated span data")
+    matches = []
+    previous_end = 0
+    for start, end, type_code, source_code, confidence in _RECORD.iter_unpack(data[1:]):
+        # encode_spans writes resolved (non-overlapping) matches in start order
+        if not previous_end <= start <= end <= len(text):
+            raise ValueError(f"Span {start}-{end} is out of order, overlapping or outside the text")
+        previous_end = end
+        try:
+            matches.append(PIIMatch(
+                text=text[start:end],
+                start=start,
+                end=end,
+                pii_type=SPAN_TYPES[type_code],
+                confidence=confidence / 100,
+                source=SPAN_SOURCES[source_code],
+            ))
+        except IndexError:
+            raise ValueError("Unknown PII type or source code in span data") from None
+    return matches
+
+
+def render_redacted(text: str, spans: Iterable[PIIMatch], reveal: Collection[PIIType] = (),
+                    min_confidence: float = 0.0) -> str:
+    """Redact text from stored spans, except types in reveal and spans below min_confidence."""
+    hidden = [span for span in spans if span.pii_type not in reveal and span.confidence >= min_confidence]
+    redacted, _ = get_redactor().redact_with_offsets(text, hidden)
+    return redacted
@@ -0,0 +1,222 @@
+"""
+Re-run redaction over every stored application after the detection rules change
+Streams Applications rows from Postgres with a server-side cursor, redacts them on a
+process pool and writes censoredCv (plus the Markdown and PII spans it was rendered
+from) back in batched UPDATEs. Detection runs on the stored cvMarkdown, so the
+document keeps its shape; only rows without it are rebuilt from the PDF with
+--formatter. Progress is checkpointed after every batch, so an interrupted run
+continues where it stopped.
+Run with: python reredact.py --formatter llm|rules [--workers 4] [--batch-size 100] [--dry-run]
+
+Needs psycopg 3 (uv sync --extra reredact) and the same POSTGRES_* variables as the
+frontend, or --dsn.
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger("reredact")
+
+# (censoredCv, cvMarkdown, piiSpans) as the server returns them
+Columns = Tuple[str, str, str]
+# (id, columns or None, error or None)
+RowResult = Tuple[str, Optional[Columns], Optional[str]]
+
+# Engine settings for the worker processes, set by _init_worker
+_worker_options: dict = {}
+
+
+def _dsn_from_env() -> str:
+    return " ".join([
+        f"host={os.getenv('POSTGRES_HOST', 'localhost')}",
+        f"port={os.getenv('POSTGRES_PORT', '5432')}",
+        f"dbname={os.getenv('POSTGRES_DB', 'postgres')}",
+        f"user={os.getenv('POSTGRES_USER', 'postgres')}",
+        f"password={os.getenv('POSTGRES_PASSWORD', 'postgres')}",
+    ])
+
+
+def _init_worker(formatter: str, use_presidio: bool, use_spacy_names: bool):
+    """Build the shared redactor once per worker process instead of once per row"""
+    from pii_redactor import get_redactor
+
+    _worker_options.update(formatter=formatter, use_presidio=use_presidio, use_spacy_names=use_spacy_names)
+    get_redactor(use_presidio=use_presidio, use_spacy_names=use_spacy_names)
+
+
+def _redact_row(row: Tuple[str, str, str, Optional[str]]) -> RowResult:
+    """Redact one stored CV's Markdown (extracted from the PDF if none is stored);
+    returns the columns the way the server encodes them"""
+    from extract_text import extract_text_to_markdown
+    from pii_redactor import redact_text
+    from pii_spans import encode_spans
+
+    application_id, display_name, cv_base64, markdown_base64 = row
+    try:
+        if markdown_base64:
+            markdown = base64.b64decode(markdown_base64).decode("utf-8")
+        else:
+            markdown = extract_text_to_markdown(cv_base64, _worker_options["formatter"])
+        redacted, matches = redact_text(
+            markdown,
+            use_presidio=_worker_options["use_presidio"],
+            applicant_name=display_name,
+            use_spacy_names=_worker_options["use_spacy_names"],
+        )
+        columns = (
+            base64.b64encode(redacted.encode("utf-8")).decode("ascii"),
+            base64.b64encode(markdown.encode("utf-8")).decode("ascii"),
+            encode_spans(matches),
+        )
+        return application_id, columns, None
+    except Exception as e:
+        return application_id, None, f"{type(e).__name__}: {e}"
+
+
+class Checkpoint:
+    """Last fully written application id plus running totals, stored as JSON"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.last_id: Optional[str] = None
+        self.updated = 0
+        self.failed = 0
+
+    def load(self) -> "Checkpoint":
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            self.last_id = data["last_id"]
+            self.updated = data["updated"]
+            self.failed = data["failed"]
+        return self
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"last_id": self.last_id, "updated": self.updated, "failed": self.failed}))
+        tmp.replace(self.path)  # atomic, a crash never leaves half a checkpoint
+
+
+def stream_rows(conn, after_id: Optional[str],
+                batch_size: int) -> Iterator[List[Tuple[str, str, str, Optional[str]]]]:
+    """Batches of (id, display_name, cv, cvMarkdown) ordered by id, fetched through a server-side cursor"""
+    with conn.cursor(name="reredact_applications") as cur:
+        cur.itersize = batch_size
+        cur.execute(
+            "SELECT id, display_name, cv, cvMarkdown FROM Applications WHERE %s::text IS NULL OR id > %s ORDER BY id",
+            (after_id, after_id),
+        )
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
+
+def write_batch(conn, results: List[RowResult], checkpoint: Checkpoint, dry_run: bool):
+    """Write one batch in a single transaction, then advance the checkpoint"""
+    updates = [(*columns, application_id) for application_id, columns, error in results if error is None]
+    for application_id, _, error in results:
+        if error is not None:
+            logger.warning("Application %s failed: %s", application_id, error)
+
+    if updates and not dry_run:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.executemany(
+                    "UPDATE Applications SET censoredCv = %s, cvMarkdown = %s, piiSpans = %s WHERE id = %s",
+                    updates,
+                )
+
+    checkpoint.last_id = results[-1][0]
+    checkpoint.updated += len(updates)
+    checkpoint.failed += len(results) - len(updates)
+    if not dry_run:
+        checkpoint.save()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Re-redact every stored CV in the Applications table")
+    parser.add_argument('--dsn', type=str, help='Postgres connection string (default: POSTGRES_* variables)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Redaction processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Rows per fetch and UPDATE batch (default: 100)')
+    parser.add_argument('--formatter', choices=['rules', 'llm'], required=True,
+                        help='How to rebuild the Markdown for rows without a stored cvMarkdown; use the '
+                             'formatter that produced the stored CVs (llm for the server default)')
+    parser.add_argument('--presidio', action='store_true', help='Enable Presidio detection')
+    parser.add_argument('--spacy-names', action='store_true', dest='spacy_names', help='Enable spaCy name detection')
+    parser.add_argument('--checkpoint', type=Path, default=Path('reredact.checkpoint.json'),
+                        help='Resume file (default: reredact.checkpoint.json)')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and start over')
+    parser.add_argument('--dry-run', action='store_true', help='Redact but do not write rows or checkpoints')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    load_dotenv()
+    try:
+        import psycopg
+    except ImportError:
+        print('❌ psycopg is required: uv sync --extra reredact')
+        sys.exit(1)
+
+    checkpoint = Checkpoint(args.checkpoint)
+    if not args.restart:
+        checkpoint.load()
+    if checkpoint.last_id:
+        print(f"↩️  Resuming after application {checkpoint.last_id} ({checkpoint.updated} already updated)")
+
+    dsn = args.dsn or _dsn_from_env()
+    # The named cursor lives in the read connection's transaction, so writes use their own connection
+    with psycopg.connect(dsn) as read_conn, psycopg.connect(dsn, autocommit=True) as write_conn:
+        total = read_conn.execute(
+            "SELECT count(*) FROM Applications WHERE %s::text IS NULL OR id > %s",
+            (checkpoint.last_id, checkpoint.last_id),
+        ).fetchone()[0]
+        print(f"📄 {total} applications to re-redact with {args.workers} workers")
+
+        start = time.perf_counter()
+        already_done = checkpoint.updated + checkpoint.failed
+
+        def flush(results: List[RowResult]):
+            write_batch(write_conn, results, checkpoint, args.dry_run)
+            processed = checkpoint.updated + checkpoint.failed - already_done
+            elapsed = time.perf_counter() - start
+            rate = processed / elapsed if elapsed else 0.0
+            eta = (total - processed) / rate if rate else 0.0
+            print(f"  {processed}/{total} rows, {rate:.1f} rows/s, ETA {eta:.0f}s", flush=True)
+
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(args.formatter, args.presidio, args.spacy_names),
+        ) as pool:
+            chunksize = max(1, args.batch_size // (args.workers * 4))
+            pending = None
+            for rows in stream_rows(read_conn, checkpoint.last_id, args.batch_size):
+                # Submit this batch before writing the previous one, so workers never wait on the database
+                submitted = pool.map(_redact_row, rows, chunksize=chunksize)
+                if pending is not None:
+                    flush(list(pending))
+                pending = submitted
+
+            if pending is not None:
+                flush(list(pending))
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Done in {elapsed:.1f}s: {checkpoint.updated} updated, {checkpoint.failed} failed"
+          + (" (dry run, nothing written)" if args.dry_run else ""))
+    if not args.dry_run and args.checkpoint.exists():
+        args.checkpoint.unlink()
+
+
+if __name__ == "__main__":
+    main()
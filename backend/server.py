@@ -1,43 +1,344 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 import base64
-from extract_text import extract_text_to_markdown
-from pii_redactor import redact_text
+from extract_text import Formatter, extract_text_to_markdown_async, markdown_cache
+from incremental import redact_text_incremental, segment_cache
+from llm_client import get_async_client
+from metrics import REQUEST_SECONDS, render_metrics, server_timing_header, span, start_request
+from micro_batch import MicroBatcher
+from pii_redactor import PIIType, get_redactor, redact_text, redact_texts
+from pii_spans import decode_spans, encode_spans, render_redacted
 #from llm_anonymizer import anonymize_pdf_with_llm
 
-app = FastAPI()
+logger = logging.getLogger("server")
+
+# uvicorn only configures its own loggers, so give the app's a handler; otherwise
+# INFO lines (request timings, "request received") are dropped by the root logger
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+for _name in ("server", "extract_text", "llm_anonymizer"):
+    _app_logger = logging.getLogger(_name)
+    _app_logger.setLevel(LOG_LEVEL)
+    _app_logger.addHandler(_log_handler)
+    _app_logger.propagate = False
+
+# Engine configuration used by /anonymize
+USE_PRESIDIO = False  # Set to True if you want Presidio
+USE_SPACY_NAMES = False  # Set to True if you want spaCy NER
+
+# Re-uploads of an edited CV reuse cached LLM formatting per page and NER per paragraph
+INCREMENTAL_REDACTION = os.getenv("INCREMENTAL_REDACTION", "0") == "1"
+
+# With spaCy on, concurrent requests are redacted together in one nlp.pipe call
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "16"))
+NER_BATCH_WAIT_MS = float(os.getenv("NER_BATCH_WAIT_MS", "10"))
+
+# CVs of one /anonymize/batch request decoded and processed at the same time
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+
+def _redact_batch(items: list[tuple[str, str | None]]) -> list[tuple[str, list]]:
+    """Redact (markdown, applicant name) pairs with one batched NER pass."""
+    texts, applicant_names = zip(*items)
+    return redact_texts(list(texts), list(applicant_names),
+                        use_presidio=USE_PRESIDIO, use_spacy_names=USE_SPACY_NAMES)
+
+
+redaction_batcher = MicroBatcher(_redact_batch, NER_BATCH_SIZE, NER_BATCH_WAIT_MS / 1000)
+
+
+# Filled in by the background warm-up, reported by /ready
+engines_ready = {"redactor": False, "spacy": False, "presidio": False, "llm_client": False, "pdf": False}
+
+
+def _warm_up():
+    """Load the heavy engines so the first request doesn't pay for them."""
+    try:
+        import pymupdf  # noqa: F401
+        engines_ready["pdf"] = True
+        
+        # Build the shared redactor (patterns, spaCy, Presidio) once
+        redactor = get_redactor(use_presidio=USE_PRESIDIO, use_spacy_names=USE_SPACY_NAMES)
+        engines_ready["spacy"] = redactor.name_detector.nlp is not None
+        engines_ready["presidio"] = bool(redactor.use_presidio)
+        engines_ready["redactor"] = True
+        
+        get_async_client()
+        engines_ready["llm_client"] = True
+    except Exception as e:
+        logger.exception("Warm-up failed: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start serving right away; engines load in a worker thread meanwhile
+    warm_up = asyncio.create_task(asyncio.to_thread(_warm_up))
+    yield
+    await warm_up
+
+app = FastAPI(lifespan=lifespan)
+
+# Responses in this format are streamed while the work is still running
+STREAMED_MEDIA_TYPE = "application/x-ndjson"
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """Collect stage timings per request: Server-Timing header, histogram and one log line."""
+    timings = start_request()
+    start = time.perf_counter()
+    response = await call_next(request)
+    
+    def finish():
+        timings["total"] = time.perf_counter() - start
+        # Label by route template, so unknown paths (404 scans) share one series
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(route.path if route is not None else "unmatched", timings["total"])
+        if request.url.path.startswith("/anonymize"):
+            logger.info("%s %s status=%d timings_ms=%s", request.method, request.url.path, response.status_code,
+                        json.dumps({stage: round(seconds * 1000, 1) for stage, seconds in timings.items()}))
+    
+    if response.headers.get("content-type", "").startswith(STREAMED_MEDIA_TYPE):
+        # The work happens while the body streams: record once it has been sent,
+        # no Server-Timing header since headers go out before any result
+        body = response.body_iterator
+        
+        async def timed_body():
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                finish()
+        
+        response.body_iterator = timed_body()
+        return response
+    
+    finish()
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
 
 class CVTextRequest(BaseModel):
     cvBase64: str
     firstName: str
     lastName: str
+    formatter: Formatter = "llm"  # "rules" skips the LLM entirely
 
 class AnonymizeResponse(BaseModel):
     markdown: str
+    original: str = ""  # Base64 unredacted Markdown the spans refer to
+    spans: str = ""  # Detected PII spans, see pii_spans.encode_spans
+
+class RenderRequest(BaseModel):
+    original: str  # Base64 unredacted Markdown, as returned by /anonymize
+    spans: str
+    reveal: list[PIIType] = []  # PII types to leave in the text
+    minConfidence: float = 0.0  # Spans below this confidence are left in too
+
+class BatchCVRequest(CVTextRequest):
+    id: str | None = None  # Echoed back so the caller can match results
 
 @app.get("/")
 def root():
-    return {"status": "API running", "endpoint": "/anonymize"}
+    return {"status": "API running", "endpoint": "/anonymize", "batch_endpoint": "/anonymize/batch"}
 
-@app.post("/anonymize")
-def anonymize(request: CVTextRequest):
-    print("Anonymization request received." + str(request))
-    try:
-        
-        # Extract text to Markdown
-        markdown = extract_text_to_markdown(request.cvBase64)
-        
-        # Redact PII from markdown
-        redacted_markdown, pii_matches = redact_text(
-            markdown, 
-            use_presidio=False,  # Set to True if you want Presidio
-            applicant_name= (request.firstName + " " + request.lastName),
-            use_spacy_names=False  # Set to True if you want spaCy NER
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once the engines this server uses are loaded, else 503."""
+    required = ["redactor", "llm_client", "pdf"]
+    if USE_SPACY_NAMES:
+        required.append("spacy")
+    if USE_PRESIDIO:
+        required.append("presidio")
+    is_ready = all(engines_ready[name] for name in required)
+    return JSONResponse(
+        {"ready": is_ready, "engines": engines_ready},
+        status_code=200 if is_ready else 503,
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text format: per-stage and per-endpoint latency histograms."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/markdown")
+def markdown_cache_stats():
+    return markdown_cache.stats()
+
+@app.get("/cache/segments")
+def segment_cache_stats():
+    return segment_cache.stats()
+
+def _applicant_name(first_name: str, last_name: str) -> str | None:
+    """The applicant's full name, or None when neither part is given."""
+    return " ".join(part.strip() for part in (first_name, last_name) if part.strip()) or None
+
+async def _redact_pdf(pdf_input: bytes | str, first_name: str, last_name: str,
+                      formatter: Formatter = "llm") -> tuple[str, str, list]:
+    """Extract, format and redact one CV (raw or base64 PDF).
+
+    Returns the unredacted Markdown, the redacted Markdown and the PII matches.
+    """
+    applicant_name = _applicant_name(first_name, last_name)
+    
+    # Extract text to Markdown (PDF parsing in a thread, LLM call awaited)
+    markdown = await extract_text_to_markdown_async(pdf_input, formatter, INCREMENTAL_REDACTION)
+    
+    # Redact PII from markdown (CPU-bound, keep it off the event loop)
+    if INCREMENTAL_REDACTION:
+        redacted_markdown, pii_matches = await asyncio.to_thread(
+            redact_text_incremental,
+            markdown,
+            use_presidio=USE_PRESIDIO,
+            applicant_name=applicant_name,
+            use_spacy_names=USE_SPACY_NAMES
         )
-        
-        return AnonymizeResponse(
-            markdown=base64.b64encode(redacted_markdown.encode("utf-8")).decode("ascii")
+    elif USE_SPACY_NAMES:
+        with span("redact_batched"):
+            redacted_markdown, pii_matches = await redaction_batcher.submit(
+                (markdown, applicant_name)
+            )
+    else:
+        redacted_markdown, pii_matches = await asyncio.to_thread(
+            redact_text,
+            markdown, 
+            use_presidio=USE_PRESIDIO,
+            applicant_name=applicant_name,
+            use_spacy_names=USE_SPACY_NAMES
         )
+    
+    return markdown, redacted_markdown, pii_matches
+
+def _b64(text: str) -> str:
+    return base64.b64encode(text.encode("utf-8")).decode("ascii")
+
+async def _anonymize_cv(request: CVTextRequest) -> AnonymizeResponse:
+    """Anonymize a JSON request; Markdown fields are base64-encoded."""
+    markdown, redacted_markdown, pii_matches = await _redact_pdf(
+        request.cvBase64, request.firstName, request.lastName, request.formatter
+    )
+    return AnonymizeResponse(markdown=_b64(redacted_markdown), original=_b64(markdown),
+                             spans=encode_spans(pii_matches))
+
+@app.post("/anonymize")
+async def anonymize(request: CVTextRequest):
+    logger.info("Anonymization request received (%d base64 chars).", len(request.cvBase64))
+    try:
+        return await _anonymize_cv(request)
+    except Exception as e:
+        logger.exception("Error during anonymization: %s", e)
+        raise HTTPException(status_code=400, detail=f"An error occurred: {str(e)}")
+
+@app.post("/render")
+def render(request: RenderRequest):
+    """
+    Re-render a CV under a reveal policy from what /anonymize returned.
+    
+    Uses the stored spans only: no detection or LLM calls, one pass over the text.
+    Response: {"markdown": base64 Markdown with every non-revealed span redacted}.
+    """
+    try:
+        original = base64.b64decode(request.original, validate=True).decode("utf-8")
+        spans = decode_spans(request.spans, original)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid original or spans: {e}")
+    with span("render"):
+        markdown = render_redacted(original, spans, set(request.reveal), request.minConfidence)
+    return {"markdown": _b64(markdown)}
+
+@app.post("/anonymize/pdf", response_class=PlainTextResponse)
+async def anonymize_pdf(request: Request, firstName: str = "", lastName: str = "",
+                        formatter: Formatter = "llm"):
+    """
+    Anonymize a CV uploaded as binary, without base64/JSON wrapping.
+    
+    Body: either the raw PDF (Content-Type: application/pdf, names as query
+    parameters) or multipart/form-data with a "cv" file and optional
+    "firstName"/"lastName" fields.
+    Response: the redacted Markdown as text/markdown.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("cv")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing 'cv' file in form data")
+        pdf_bytes = await upload.read()
+        firstName = str(form.get("firstName", firstName))
+        lastName = str(form.get("lastName", lastName))
+    else:
+        pdf_bytes = await request.body()
+    
+    if not pdf_bytes:
+        raise HTTPException(status_code=400, detail="Empty PDF upload")
+    
+    logger.info("Binary anonymization request received (%d bytes).", len(pdf_bytes))
+    try:
+        _, redacted_markdown, _ = await _redact_pdf(pdf_bytes, firstName, lastName, formatter)
     except Exception as e:
-        print(f"Error during anonymization: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"An error occurred: {str(e)}")
\ No newline at end of file
+        logger.exception("Error during anonymization: %s", e)
+        raise HTTPException(status_code=400, detail=f"An error occurred: {str(e)}")
+    
+    return PlainTextResponse(redacted_markdown, media_type="text/markdown")
+
+async def _anonymize_batch_item(index: int, line: bytes, limit: asyncio.Semaphore) -> dict:
+    async with limit:
+        try:
+            item = BatchCVRequest.model_validate_json(line)
+        except ValidationError as e:
+            return {"index": index, "id": None, "error": f"Invalid request: {e}"}
+        try:
+            return {"index": index, "id": item.id, **(await _anonymize_cv(item)).model_dump()}
+        except Exception as e:
+            logger.exception("Error during anonymization of batch item %d: %s", index, e)
+            return {"index": index, "id": item.id, "error": f"An error occurred: {str(e)}"}
+
+@app.post("/anonymize/batch")
+async def anonymize_batch(request: Request):
+    """
+    Anonymize many CVs in one call.
+    
+    Body: NDJSON, one CVTextRequest object per line (optionally with an "id").
+    Response: NDJSON, one {"index", "id", "markdown", "original", "spans" | "error"}
+    object per CV,
+    streamed in completion order as soon as each CV is done. At most
+    BATCH_MAX_CONCURRENCY CVs of the batch are processed at the same time.
+    """
+    tasks: list[asyncio.Task] = []
+    limit = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    buffer = bytearray()
+    
+    def start(line: bytes):
+        if line.strip():
+            tasks.append(asyncio.create_task(_anonymize_batch_item(len(tasks), line, limit)))
+    
+    # Start work on each CV as soon as its line has arrived; only the new bytes
+    # are scanned for a line break, so a multi-MB line is not re-split per chunk
+    async for chunk in request.stream():
+        scan_from = len(buffer)
+        buffer += chunk
+        line_start = 0
+        while (line_end := buffer.find(b"\n", scan_from)) != -1:
+            start(bytes(buffer[line_start:line_end]))
+            line_start = scan_from = line_end + 1
+        del buffer[:line_start]
+    start(bytes(buffer))
+    
+    logger.info("Batch anonymization request received with %d CVs.", len(tasks))
+    
+    async def results():
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+        finally:
+            # Client went away: stop work that nobody will read
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(results(), media_type=STREAMED_MEDIA_TYPE)
\ No newline at end of file
@@ -0,0 +1,5 @@
+-- Adds the stored PII span columns to databases created before they were in setup.sql
+-- (setup.sql only runs when the database is first initialised). Safe to run more than once:
+--   docker compose -f docker-compose-db.yaml exec -T postgres psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" < db/migrate_pii_spans.sql
+ALTER TABLE Applications ADD COLUMN IF NOT EXISTS cvMarkdown TEXT;
+ALTER TABLE Applications ADD COLUMN IF NOT EXISTS piiSpans TEXT;
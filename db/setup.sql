@@ -47,6 +47,8 @@ CREATE TABLE Applications (
     dateSent TIMESTAMP NOT NULL,
     censoredCv TEXT NOT NULL,
     cv TEXT NOT NULL,
+    cvMarkdown TEXT,
+    piiSpans TEXT,
     uncensored_by TEXT,
     state TEXT NOT NULL CHECK (state IN ('Censored', 'Viewed', 'Uncensored', 'Candidate')),
     FOREIGN KEY (userId) REFERENCES Users(id),
@@ -10,6 +10,8 @@ export interface Application extends IdentifiableObject {
     datesent: Date,         // The date of which the application was submitted.
     censoredcv: string,     // The censored CV, stripped of all defining details.
     cv: string,             // Contains the original CV, not modified at all (submitted CV).
+    cvmarkdown: string | null, // The CV as unredacted Markdown, which piispans refer to.
+    piispans: string | null,   // Detected PII spans, used to render partial reveals without re-censoring.
     uncensored_by: string,     // The censored CV, stripped of all defining details.
     state: ApplicationState, // The state of which the application is currently in.
 
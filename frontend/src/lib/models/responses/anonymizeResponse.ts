@@ -1,4 +1,6 @@
 // The response body when requesting censoring of cv.
 export default interface AnonymizeResponse {
-    markdown: string
+    markdown: string,
+    original: string, // The unredacted Markdown (base64) that spans refer to.
+    spans: string     // Detected PII spans in compact form.
 }
\ No newline at end of file
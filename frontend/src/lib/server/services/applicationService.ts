@@ -27,6 +27,8 @@ export async function SubmitApplication(request: ApplicationSubmitRequest, jobId
             dateSent,
             censoredCv,
             cv,
+            cvMarkdown,
+            piiSpans,
             uncensored_by,
             state
         ) VALUES (
@@ -36,6 +38,8 @@ export async function SubmitApplication(request: ApplicationSubmitRequest, jobId
             NOW(),
             '${anonymizedCv.markdown}',
             '${request.CV}',
+            '${anonymizedCv.original ?? ""}',
+            '${anonymizedCv.spans ?? ""}',
             'null',
             '${ApplicationState.Censored}'
         );